@@ -1,14 +1,13 @@
+import shutil
+
 from .common import APP_NAME, set_wait_on_rate_limit, RateLimitError, RetrievalFailed, logger, update_config
+from .download import close_curl_cffi_session
 from .integrations import Telegram, X
-from .retrieval import retrieve
+from .retrieval import retrieve, clear_cache
 from .secrets import configure_secrets
-from .util import run_command
 
-# Check if ffmpeg is available.
-try:
-    run_command(["ffmpeg", "-version"])
-    ffmpeg_available = True
-except FileNotFoundError:
+# Check if ffmpeg is available. A PATH lookup suffices, no need to spawn a process at import time.
+ffmpeg_available = shutil.which("ffmpeg") is not None
+if not ffmpeg_available:
     logger.warning("⚠️ FFmpeg not found. Won't normalize videos. If you want to enable it, please install FFmpeg "
                    "via `conda install -c conda-forge ffmpeg`.")
-    ffmpeg_available = False
@@ -1,7 +1,9 @@
 import logging
 import os
 import sys
+import tempfile
 from pathlib import Path
+from typing import Any
 
 import yaml
 from platformdirs import user_config_dir
@@ -9,6 +11,12 @@ from platformdirs import user_config_dir
 from .exceptions import RateLimitError, RetrievalFailed
 from .scraping_response import ScrapingResponse
 
+# Prefer the libyaml bindings, fall back to the pure-Python implementation if unavailable
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 APP_NAME = "scrapeMM"
 
 # Set up config directory
@@ -30,18 +38,69 @@ if not logger.hasHandlers():
 
 WAIT_ON_RATE_LIMIT = False
 
+# Parsed YAML files, keyed by path and holding the modification time they were parsed at
+_yaml_cache: dict[str, tuple[int, Any]] = {}
+
+
+def load_yaml_cached(path: str | Path) -> Any:
+    """Parses the YAML file at the given path. Re-uses the previously parsed
+    contents as long as the file was not modified in the meantime."""
+    path = str(path)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _yaml_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r") as f:
+        data = yaml.load(f, Loader=SafeLoader)
+    _yaml_cache[path] = (mtime, data)
+    return data
+
+
+def write_file_atomic(path: str | Path, data: bytes):
+    """Writes the data to a sibling temporary file and moves it into place afterward,
+    so that an interrupted write never leaves a truncated file behind."""
+    path = str(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        # mkstemp creates the file with mode 0600, so keep the mode of the file being replaced
+        os.chmod(tmp_path, _get_file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())  # Make sure the data is on disk before the file is moved into place
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _get_file_mode(path: str) -> int:
+    """Returns the permission bits of the file at the given path or, if it does not exist,
+    the default mode for new files under the current umask."""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def dump_yaml_atomic(obj: Any, path: str | Path):
+    """Atomically writes the object as YAML to the given path."""
+    write_file_atomic(path, yaml.dump(obj, Dumper=SafeDumper).encode())
+    _yaml_cache.pop(str(path), None)
+
 
 def load_config() -> dict:
     if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "r") as f:
-            return yaml.safe_load(f) or {}
+        return load_yaml_cached(CONFIG_PATH) or {}
     else:
         return {}
 
 
 def update_config(**kwargs):
     _config.update(kwargs)
-    yaml.dump(_config, open(CONFIG_PATH, "w"))
+    dump_yaml_atomic(_config, CONFIG_PATH)
 
 
 def get_config_var(name: str, default=None) -> str:
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from typing import Optional
@@ -16,6 +17,7 @@ class RetrievalIntegration(ABC):
     name: str
     domains: list[str]  # The domains supported by this integration
     connected: bool | None = None
+    _connect_lock: tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None = None
 
     @abstractmethod
     async def _connect(self):
@@ -28,8 +30,7 @@ class RetrievalIntegration(ABC):
          retrieval. Raises an exception if anything goes wrong during retrieval."""
         assert get_domain(url) in self.domains, f"Invalid domain {get_domain(url)} for integration {self.name}."
 
-        if self.connected is None:
-            await self._connect()
+        await self.connect()
 
         if not self.connected:
             raise RuntimeError(f"Connection to {self.name} service could not be established.")
@@ -37,6 +38,23 @@ class RetrievalIntegration(ABC):
         logger.debug(f"Calling {self.name} service for {url}")
         return await self._get(url, **kwargs)
 
+    async def connect(self):
+        """Establishes the connection unless already attempted. Call this ahead of time to
+        take the connection setup (authentication etc.) off the first retrieval's path."""
+        if self.connected is None:
+            # Ensure only one of multiple concurrent first calls establishes the connection
+            async with self._get_connect_lock():
+                if self.connected is None:
+                    await self._connect()
+
+    def _get_connect_lock(self) -> asyncio.Lock:
+        """Returns the lock guarding _connect(). Integrations are long-lived singletons
+        whereas locks are bound to an event loop, so a new lock is created per loop."""
+        loop = asyncio.get_running_loop()
+        if self._connect_lock is None or self._connect_lock[0] is not loop:
+            self._connect_lock = (loop, asyncio.Lock())
+        return self._connect_lock[1]
+
     @abstractmethod
     async def _get(self, url: str, **kwargs) -> MultimodalSequence:
         """Retrieves the contents present at the given URL."""
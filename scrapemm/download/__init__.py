@@ -1,3 +1,4 @@
 from .media import download_medium
-from .images import download_image
-from .videos import download_video
\ No newline at end of file
+from .images import download_image, download_optional_image
+from .videos import download_video
+from .requests import close_curl_cffi_session
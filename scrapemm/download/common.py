@@ -1,5 +1,6 @@
 import ssl
 
+import aiohttp
 import certifi
 
 HEADERS = {
@@ -25,3 +26,13 @@ RELAXED_SSL_DOMAINS = {  # These domains do not support SSL verification
     "archive.fo",
     "archive.md",
 }
+
+
+def make_session() -> aiohttp.ClientSession:
+    """Creates a ClientSession with a pooled connector that keeps connections alive,
+    saving the TCP and TLS handshakes for repeated requests to the same host (e.g.,
+    HLS segments). Per-request timeouts are set by the callers. Create one session per
+    batch of work and pass it down instead of letting each download open its own."""
+    connector = aiohttp.TCPConnector(limit=100, limit_per_host=16, keepalive_timeout=30,
+                                     ttl_dns_cache=300, ssl=ssl_context)
+    return aiohttp.ClientSession(headers=HEADERS, connector=connector)
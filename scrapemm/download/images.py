@@ -36,6 +36,18 @@ async def download_image(
         return image_from_binary(content, image_url, ignore_small_images=ignore_small_images, max_size=max_size)
 
 
+async def download_optional_image(
+        image_url: Optional[str],
+        session: Union[aiohttp.ClientSession, "APIRequestContext"],
+        **kwargs
+) -> Optional[Image]:
+    """Like download_image, but returns None right away if no URL is given,
+    e.g., for a missing profile picture."""
+    if not image_url:
+        return None
+    return await download_image(image_url, session, **kwargs)
+
+
 def image_from_binary(
         content: bytes,
         source_url: str,
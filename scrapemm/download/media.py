@@ -7,7 +7,7 @@ from ezmm import Item
 if TYPE_CHECKING:
     from playwright.async_api import APIRequestContext
 
-from scrapemm.download.common import HEADERS
+from scrapemm.download.common import make_session
 from scrapemm.download.images import is_maybe_image_url, download_image
 from scrapemm.download.videos import is_maybe_video_url, download_video
 
@@ -21,11 +21,14 @@ async def download_medium(
         **kwargs
 ) -> Optional[Item]:
     """Downloads the item from the given URL and returns an instance of the
-    corresponding item class. Reuses a session if provided."""
+    corresponding item class. Reuses a session if provided. A provided session
+    remains owned by the caller and must still be open."""
 
     own_session = session is None
     if own_session:
-        session = aiohttp.ClientSession(headers=HEADERS)
+        session = make_session()
+    elif isinstance(session, aiohttp.ClientSession) and session.closed:
+        raise RuntimeError(f"Cannot download {url}: the provided session is already closed.")
 
     assert session is not None
     try:
@@ -1,13 +1,15 @@
+import asyncio
 import logging
-from typing import Optional, Union, TYPE_CHECKING
+import ssl as ssl_module
+from typing import Optional, Union, TYPE_CHECKING, Mapping
 
 import aiohttp
 
 if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
     from playwright.async_api import APIRequestContext
 
 from scrapemm.download.common import ssl_context, RELAXED_SSL_DOMAINS
-from scrapemm.download.util import stream
 
 logger = logging.getLogger("scrapeMM")
 
@@ -15,6 +17,31 @@ logger = logging.getLogger("scrapeMM")
 # while accepting real browser JA3/JA4 profiles. Tried in order until one succeeds.
 _CURL_CFFI_IMPERSONATIONS = ("chrome124",)
 
+# Shared curl_cffi session (keeps its TLS setup and connection pool across requests)
+# together with the event loop it is bound to. Replaced when a different loop runs.
+_curl_cffi_session: Optional[tuple[asyncio.AbstractEventLoop, "AsyncSession"]] = None
+
+
+def _get_curl_cffi_session() -> "AsyncSession":
+    """Returns the curl_cffi session for the running event loop, creating it if needed."""
+    global _curl_cffi_session
+    from curl_cffi.requests import AsyncSession
+    loop = asyncio.get_running_loop()
+    if _curl_cffi_session is None or _curl_cffi_session[0] is not loop:
+        _curl_cffi_session = (loop, AsyncSession())
+    return _curl_cffi_session[1]
+
+
+async def close_curl_cffi_session():
+    """Closes the shared curl_cffi session of the running event loop, if any, releasing its
+    curl handles. Call it before the event loop shuts down, e.g., at the end of the coroutine
+    passed to asyncio.run()."""
+    global _curl_cffi_session
+    if _curl_cffi_session is not None and _curl_cffi_session[0] is asyncio.get_running_loop():
+        session = _curl_cffi_session[1]
+        _curl_cffi_session = None
+        await session.close()
+
 
 async def _request_via_curl_cffi(
         url: str,
@@ -22,41 +49,40 @@ async def _request_via_curl_cffi(
 ) -> Optional[tuple[int, dict, bytes]]:
     """GET ``url`` with browser TLS impersonation. Returns (status, headers, body) or None."""
     try:
-        from curl_cffi.requests import AsyncSession
+        session = _get_curl_cffi_session()
     except ImportError:
         logger.debug("curl_cffi not available; cannot bypass bot-gated 403 for %s", url)
         return None
 
-    async with AsyncSession() as session:
-        for impersonate in _CURL_CFFI_IMPERSONATIONS:
-            try:
-                response = await session.get(
-                    url,
-                    impersonate=impersonate,
-                    headers=headers or {},
-                    allow_redirects=True,
-                )
-                status = response.status_code
-                hdrs = dict(response.headers)
-                body = response.content
-                if status == 200:
-                    logger.debug(
-                        "Retrieved %s via curl_cffi impersonate=%s (%s bytes)",
-                        url, impersonate, len(body),
-                    )
-                    return status, hdrs, body
-                if status != 403:
-                    # Real client/server error — further fingerprints won't help.
-                    return status, hdrs, body
-                logger.debug(
-                    "curl_cffi impersonate=%s still got 403 for %s; trying next profile",
-                    impersonate, url,
-                )
-            except Exception:
+    for impersonate in _CURL_CFFI_IMPERSONATIONS:
+        try:
+            response = await session.get(
+                url,
+                impersonate=impersonate,
+                headers=headers or {},
+                allow_redirects=True,
+            )
+            status = response.status_code
+            hdrs = dict(response.headers)
+            body = response.content
+            if status == 200:
                 logger.debug(
-                    "curl_cffi impersonate=%s failed for %s",
-                    impersonate, url, exc_info=True,
+                    "Retrieved %s via curl_cffi impersonate=%s (%s bytes)",
+                    url, impersonate, len(body),
                 )
+                return status, hdrs, body
+            if status != 403:
+                # Real client/server error — further fingerprints won't help.
+                return status, hdrs, body
+            logger.debug(
+                "curl_cffi impersonate=%s still got 403 for %s; trying next profile",
+                impersonate, url,
+            )
+        except Exception:
+            logger.debug(
+                "curl_cffi impersonate=%s failed for %s",
+                impersonate, url, exc_info=True,
+            )
     return None
 
 
@@ -73,12 +99,19 @@ def _merge_request_headers(
     return merged
 
 
-async def fetch_headers(url, session: Union[aiohttp.ClientSession, "APIRequestContext"], **kwargs) -> dict:
-    """Fetch only HTTP headers for a URL."""
+def _get_ssl(url: str) -> Union[ssl_module.SSLContext, bool]:
+    """Returns the shared SSL context, or False to skip certificate verification
+    for domains known to not support it."""
     from scrapemm.util import get_domain
-    ssl = None if get_domain(str(url)) in RELAXED_SSL_DOMAINS else ssl_context
+    return False if get_domain(url) in RELAXED_SSL_DOMAINS else ssl_context
+
 
-    async def _headers_via_curl_cffi() -> dict:
+async def fetch_headers(url, session: Union[aiohttp.ClientSession, "APIRequestContext"], **kwargs) -> Mapping[str, str]:
+    """Fetch only HTTP headers for a URL. With aiohttp, returns the response's
+    case-insensitive headers as is, without copying them."""
+    ssl = _get_ssl(str(url))
+
+    async def _headers_via_curl_cffi() -> Mapping[str, str]:
         result = await _request_via_curl_cffi(str(url), _merge_request_headers(session, kwargs))
         if result and result[0] == 200:
             return result[1]
@@ -97,7 +130,7 @@ async def fetch_headers(url, session: Union[aiohttp.ClientSession, "APIRequestCo
                 # aiohttp
                 async with session.head(url, ssl=ssl, **kwargs) as response:
                     response.raise_for_status()
-                    return dict(response.headers)
+                    return response.headers
         except Exception:
             logger.debug(f"HEAD failed for {url}, falling back to GET", exc_info=True)
             # Fallback to GET
@@ -110,7 +143,7 @@ async def fetch_headers(url, session: Union[aiohttp.ClientSession, "APIRequestCo
                 else:
                     async with session.get(url, ssl=ssl, **kwargs) as response:
                         response.raise_for_status()
-                        return dict(response.headers)
+                        return response.headers
             except aiohttp.ClientResponseError as e:
                 if e.status == 403:
                     return await _headers_via_curl_cffi()
@@ -131,8 +164,7 @@ async def request_static(url: str,
         return None
 
     url = str(url)
-    from scrapemm.util import get_domain
-    ssl = None if get_domain(url) in RELAXED_SSL_DOMAINS else ssl_context
+    ssl = _get_ssl(url)
 
     async def _from_curl_cffi() -> Optional[str | bytes]:
         result = await _request_via_curl_cffi(url, _merge_request_headers(session, kwargs))
@@ -159,7 +191,7 @@ async def request_static(url: str,
                 if get_text:
                     return await response.text()
                 else:
-                    return await stream(response)
+                    return await response.read()
 
     except aiohttp.ClientResponseError as e:
         if e.status == 403:
@@ -1,15 +1,5 @@
 from urllib.parse import urlparse
 
-import aiohttp
-
-
-async def stream(response: aiohttp.ClientResponse, chunk_size: int = 1024) -> bytes:
-    data = bytearray()
-    async for chunk in response.content.iter_chunked(chunk_size):
-        data.extend(chunk)
-    return bytes(data)  # Convert to immutable bytes if needed
-
-
 IMAGE_FILE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp")  # Only pixel images
 VECTOR_FILE_EXTENSIONS = (".svg", ".svgz", ".eps")
 VIDEO_FILE_EXTENSIONS = (
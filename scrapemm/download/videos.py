@@ -1,12 +1,13 @@
-from typing import Optional, TYPE_CHECKING, Union
+from collections import deque
+from typing import AsyncGenerator, Optional, TYPE_CHECKING, Union
 from urllib.parse import urljoin
+import asyncio
 import logging
 import os
 import shutil
 from functools import lru_cache
 
 import aiohttp
-import m3u8
 from ezmm import Video
 from ezmm.util import ts_to_mp4
 
@@ -20,6 +21,8 @@ from scrapemm.download.common import HEADERS
 
 logger = logging.getLogger("scrapeMM")
 
+MAX_CONCURRENT_SEGMENT_DOWNLOADS = 8  # Per HLS video, to avoid getting rate-limited by the server
+
 
 async def download_video(
         video_url: str,
@@ -91,9 +94,9 @@ async def download_hls_video(
         **kwargs
 ) -> Optional[Video]:
     """Download an HTTP Live Streaming (HLS) video from a playlist URL and return it as a Video object."""
-    try:
-        variant_content = ""
+    import m3u8  # Imported lazily as it is only needed for HLS streams
 
+    try:
         # Download the m3u8 playlist file
         playlist_content = await request_static(playlist_url, session, get_text=True, **kwargs)
 
@@ -102,13 +105,13 @@ async def download_hls_video(
             return None
 
         playlist = m3u8.loads(playlist_content)
-        base_url = playlist_url.rsplit('/', 1)[0] + '/'
+        base_url = playlist_url.rpartition('/')[0] + '/'
         final_playlist_url = playlist_url
 
         # Check if this is a master playlist (contains variant playlists)
         if playlist.is_variant:
-            # Choose the highest quality variant
-            best_playlist = playlist.playlists[-1]  # Usually the last one is of highest quality
+            # Choose the variant with the highest bandwidth, i.e., the highest quality
+            best_playlist = max(playlist.playlists, key=lambda p: p.stream_info.bandwidth or 0)
 
             # Manually construct the absolute URL for the variant playlist
             variant_url = urljoin(base_url, best_playlist.uri)
@@ -120,23 +123,17 @@ async def download_hls_video(
                 logger.error(f"Failed to download variant playlist: {variant_url}")
                 return None
 
-            # Parse the variant playlist
-            variant_playlist = m3u8.loads(variant_content)
-            playlist = variant_playlist  # Use this for segment downloads
+            # Parse the variant playlist and use it for the segment downloads
+            playlist_content = variant_content
+            playlist = m3u8.loads(variant_content)
 
             # Update base_url for segment downloads
-            base_url = variant_url.rsplit('/', 1)[0] + '/'
+            base_url = variant_url.rpartition('/')[0] + '/'
             final_playlist_url = variant_url
 
         # Detect CMAF/fMP4 vs MPEG-TS. ffmpeg error reported indicates fragments are fMP4.
         # Heuristics: EXT-X-MAP present in playlist content or segment URIs ending with .m4s/.mp4
-        content_to_check = playlist_content if final_playlist_url == playlist_url else variant_content
-        is_cmaf = False
-        try:
-            if content_to_check and ('#EXT-X-MAP' in content_to_check):
-                is_cmaf = True
-        except NameError:
-            pass
+        is_cmaf = '#EXT-X-MAP' in playlist_content
         if not is_cmaf:
             for seg in playlist.segments:
                 uri = (seg.uri or '').lower()
@@ -153,29 +150,41 @@ async def download_hls_video(
                 return video
             return None
 
-        # Download all segments
-        video_segments = []
-
-        for i, segment in enumerate(playlist.segments):
-            # Construct full URL for the segment
-            if segment.uri.startswith('http'):
-                segment_url = segment.uri
-            else:
-                segment_url = urljoin(base_url, segment.uri)
-
-            # Download the segment
-            try:
-                segment_data = await request_static(segment_url, session, get_text=False)
+        # Download all segments concurrently
+        segment_urls = [segment.uri if segment.uri.startswith('http') else urljoin(base_url, segment.uri)
+                        for segment in playlist.segments]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEGMENT_DOWNLOADS)
+
+        async def download_segment(i: int, segment_url: str) -> Optional[bytes]:
+            async with semaphore:
+                try:
+                    return await request_static(segment_url, session, get_text=False)
+                except Exception as e:
+                    logger.debug("Failed to download segment %d from %s: %s", i, segment_url, e)
+
+        # Start all downloads right away but consume the segments in playlist order
+        pending = deque(asyncio.create_task(download_segment(i, segment_url))
+                        for i, segment_url in enumerate(segment_urls))
+
+        async def segments_in_order() -> AsyncGenerator[bytes, None]:
+            while pending:
+                segment_data = await pending.popleft()
                 if segment_data:
-                    video_segments.append(segment_data)
-            except Exception as e:
-                logger.debug(f"Failed to download segment {i} from {segment_url}: {e}")
+                    yield segment_data
 
         # Combine all segments
-        if video_segments:
-            ts_bytes = b''.join(video_segments)
-            mp4_bytes = ts_to_mp4(ts_bytes)
+        try:
+            if _resolve_ffmpeg_path():
+                # Pipe each segment into FFmpeg as soon as it and its predecessors arrived
+                mp4_bytes = await _ffmpeg_remux_ts_to_mp4(segments_in_order())
+            else:
+                video_segments = [segment_data async for segment_data in segments_in_order()]
+                mp4_bytes = ts_to_mp4(b''.join(video_segments)) if video_segments else None
+        finally:
+            for task in pending:
+                task.cancel()
 
+        if mp4_bytes:
             # Create Video object with MP4 content
             video = Video(binary_data=mp4_bytes, source_url=playlist_url)
             video.relocate(move_not_copy=True)
@@ -212,8 +221,6 @@ async def _ffmpeg_remux_hls_to_mp4(playlist_url: str) -> Optional[bytes]:
 
     We pass headers for basic compatibility and copy streams without re-encoding.
     """
-    import asyncio
-
     # Prepare optional headers for ffmpeg.
     user_agent = HEADERS.get('User-Agent', '')
     headers_lines = []
@@ -264,6 +271,59 @@ async def _ffmpeg_remux_hls_to_mp4(playlist_url: str) -> Optional[bytes]:
     return None
 
 
+async def _ffmpeg_remux_ts_to_mp4(ts_segments: AsyncGenerator[bytes, None]) -> Optional[bytes]:
+    """Remuxes the given MPEG-TS segments into MP4 by streaming them through FFmpeg's
+    stdin and reading the (fragmented) MP4 from its stdout. Copies streams without re-encoding.
+    Returns None if there were no segments."""
+    cmd = [
+        _resolve_ffmpeg_path(),
+        '-loglevel', 'error',
+        '-hide_banner',
+        '-f', 'mpegts',
+        '-i', 'pipe:0',
+        '-c', 'copy',
+        # MP4 muxer to non-seekable stdout requires fragmented MP4
+        '-movflags', 'frag_keyframe+empty_moov',
+        '-f', 'mp4',
+        'pipe:1'
+    ]
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        # Drain stdout and stderr while feeding stdin to prevent the pipes from filling up
+        stdout_task = asyncio.create_task(proc.stdout.read())
+        stderr_task = asyncio.create_task(proc.stderr.read())
+        n_written = 0
+        try:
+            async for segment in ts_segments:
+                proc.stdin.write(segment)
+                n_written += 1
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # FFmpeg exited early, the error is reported below
+        finally:
+            proc.stdin.close()
+            await ts_segments.aclose()  # Finish the generator now instead of upon garbage collection
+
+        stdout, stderr = await asyncio.gather(stdout_task, stderr_task)
+        await proc.wait()
+        if n_written == 0:
+            return None
+        if proc.returncode == 0 and stdout:
+            return stdout
+        err = stderr.decode('utf-8', errors='ignore') if stderr else ''
+        raise RuntimeError(f"FFmpeg error:\n{err}")
+    except Exception as e:
+        logger.error(f"FFmpeg failed: {e}")
+    return None
+
+
 @lru_cache(maxsize=1)
 def _resolve_ffmpeg_path() -> Optional[str]:
     """Find an FFmpeg executable path using env vars, PATH, common Windows locations,
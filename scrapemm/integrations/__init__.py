@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 
 from ezmm import MultimodalSequence
@@ -41,6 +42,12 @@ DOMAIN_TO_INTEGRATION = {
     for domain in integration.domains
 }
 
+# Names of all integrations supporting a domain, in order of RETRIEVAL_INTEGRATIONS
+DOMAIN_TO_INTEGRATION_NAMES: dict[str, list[str]] = {}
+for _integration in RETRIEVAL_INTEGRATIONS:
+    for _domain in _integration.domains:
+        DOMAIN_TO_INTEGRATION_NAMES.setdefault(_domain, []).append(_integration.name)
+
 NAME_TO_INTEGRATION = {integration.name.lower(): integration for integration in RETRIEVAL_INTEGRATIONS}
 
 INTEGRATION_NAMES = [integration.name for integration in RETRIEVAL_INTEGRATIONS]
@@ -52,9 +59,16 @@ async def retrieve_via_integration(url: str, integration_name: str, **kwargs) ->
         return await integration.get(url, **kwargs)
 
 
+async def connect_integrations(integration_names: Optional[list[str]] = None):
+    """Connects the specified integrations (default: all) concurrently. Optional; integrations
+    connect lazily on first use otherwise."""
+    if integration_names is None:
+        integrations = RETRIEVAL_INTEGRATIONS
+    else:
+        integrations = [NAME_TO_INTEGRATION[name.lower()] for name in integration_names]
+    await asyncio.gather(*[integration.connect() for integration in integrations])
+
+
 def get_integrations_for_url(url: str) -> list[str]:
     """Returns the list of integration names that support the given domain."""
-    domain = get_domain(url)
-    return [integration.name
-            for integration in RETRIEVAL_INTEGRATIONS
-            if domain in integration.domains]
+    return list(DOMAIN_TO_INTEGRATION_NAMES.get(get_domain(url), []))
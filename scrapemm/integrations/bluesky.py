@@ -1,16 +1,56 @@
+import asyncio
 import logging
+import re
+from collections import OrderedDict
 
 import aiohttp
-from atproto_client.exceptions import RequestErrorBase
-from ezmm import MultimodalSequence
+from ezmm import MultimodalSequence, Item
 
 from scrapemm.common.exceptions import TargetUnavailableError
 from scrapemm.common.retrieval_integration import RetrievalIntegration
-from scrapemm.download import download_video, download_image
+from scrapemm.download import download_video, download_image, download_optional_image
 from scrapemm.secrets import get_secret
 
 logger = logging.getLogger("scrapeMM")
 
+BSKY_POST_URL_REGEX = re.compile(r"bsky\.app/profile/([^/?#]+)/post/([^/?#]+)")
+MAX_CACHED_DIDS = 1024
+UNAVAILABLE_STATUS_CODES = frozenset({400, 404})
+
+
+async def _handle_image_embed(embed, session: aiohttp.ClientSession, max_video_size: int | None) -> list[Item]:
+    media = []
+    for img in embed.images:
+        if img_url := getattr(img, 'fullsize', None):
+            if image := await download_image(img_url, session):
+                media.append(image)
+    return media
+
+
+async def _handle_video_embed(embed, session: aiohttp.ClientSession, max_video_size: int | None) -> list[Item]:
+    video = await download_video(embed.playlist, session)
+    if not video:
+        return []
+    if max_video_size is not None and video.size > max_video_size:
+        logger.info(f"Removing video {video.reference} because it exceeds the maximum size "
+                    f"of {max_video_size / 1024 / 1024:.2f} MB.")
+        return []
+    return [video]
+
+
+# Maps the embed type to the routine extracting the embedded media
+EMBED_HANDLERS = {
+    'app.bsky.embed.images#view': _handle_image_embed,
+    'app.bsky.embed.video#view': _handle_video_embed,
+}
+
+# Maps the rich text feature type to the collected list and the feature's attribute holding the value
+FACET_FIELDS = {
+    'app.bsky.richtext.facet#tag': ('hashtags', 'tag'),
+    'app.bsky.richtext.facet#mention': ('mentions', 'did'),
+    'app.bsky.richtext.facet#link': ('external_links', 'uri'),
+}
+
 
 class Bluesky(RetrievalIntegration):
     name = "Bluesky"
@@ -27,6 +67,8 @@ class Bluesky(RetrievalIntegration):
 
         from atproto import AsyncClient
         self.client = AsyncClient()
+        self.did_cache: OrderedDict[str, str] = OrderedDict()  # Maps handles to their resolved DIDs, LRU-ordered
+        self.pending_resolutions: dict[str, asyncio.Task] = {}  # Handles currently being resolved
         await self._authenticate()
 
     async def _get(self, url: str, **kwargs) -> MultimodalSequence:
@@ -44,6 +86,8 @@ class Bluesky(RetrievalIntegration):
             max_video_size: int | None = None
     ) -> MultimodalSequence:
         """Retrieve a post from the given Bluesky URL."""
+        from atproto_client.exceptions import RequestErrorBase
+
         uri = await self._construct_uri(url)
         if not uri:
             raise RuntimeError(f"Could not construct URI for Bluesky post: {url}")
@@ -52,78 +96,54 @@ class Bluesky(RetrievalIntegration):
             thread_response = await self.client.get_post_thread(uri=uri, depth=0, parent_height=0)
             thread = thread_response.thread
 
-            if hasattr(thread, 'py_type'):
-                thread_type = getattr(thread, 'py_type')
-                if thread_type == 'app.bsky.feed.defs#notFoundPost':
-                    raise Exception(f"Post not found for url {url}")
-                if thread_type == 'app.bsky.feed.defs#blockedPost':
-                    raise Exception(f"Post is blocked for url {url}")
+            thread_type = getattr(thread, 'py_type', None)
+            if thread_type == 'app.bsky.feed.defs#notFoundPost':
+                raise Exception(f"Post not found for url {url}")
+            if thread_type == 'app.bsky.feed.defs#blockedPost':
+                raise Exception(f"Post is blocked for url {url}")
 
             # Extract post data
             post_view = thread.post
             record = post_view.record
 
             # Basic post information
-            post_text = record.text if hasattr(record, 'text') else ''
-            created_at_str = record.created_at[:-1] if hasattr(record, 'created_at') else None
+            post_text = getattr(record, 'text', '')
+            created_at_str = getattr(record, 'created_at', None)
+            if created_at_str:
+                created_at_str = created_at_str[:-1]
 
             # Author information
             author = post_view.author
-            author_username = author.handle if hasattr(author, 'handle') else ''
-            author_display_name = author.display_name if hasattr(author, 'display_name') else ''
+            author_username = getattr(author, 'handle', '')
+            author_display_name = getattr(author, 'display_name', '')
 
             # Engagement metrics
-            like_count = post_view.like_count if hasattr(post_view, 'like_count') else 0
-            comment_count = post_view.reply_count if hasattr(post_view, 'reply_count') else 0
-            share_count = post_view.repost_count if hasattr(post_view, 'repost_count') else 0
+            like_count = getattr(post_view, 'like_count', 0)
+            comment_count = getattr(post_view, 'reply_count', 0)
+            share_count = getattr(post_view, 'repost_count', 0)
 
-            # Extract media (images)
+            # Extract media (images and videos) embedded in the post
             media = []
-            # Check for embedded images in the post
             if hasattr(post_view, 'embed'):
                 embed = post_view.embed
+                if handler := EMBED_HANDLERS.get(getattr(embed, 'py_type', None)):
+                    media = await handler(embed, session, max_video_size)
 
-                # For image embeds
-                if hasattr(embed, 'py_type') and getattr(embed, 'py_type') == 'app.bsky.embed.images#view':
-                    for img in embed.images:
-                        if hasattr(img, 'fullsize'):
-                            img_url = img.fullsize
-                            img = await download_image(img_url, session)
-                            media.append(img)
-                # For video embeds
-                elif hasattr(embed, 'py_type') and getattr(embed, 'py_type') == 'app.bsky.embed.video#view':
-                    video = await download_video(embed.playlist, session)
-                    if video:
-                        if max_video_size is None or video.size <= max_video_size:
-                            media.append(video)
-                        else:
-                            logger.info(f"Removing video {video.reference} because it exceeds the maximum size "
-                                        f"of {max_video_size / 1024 / 1024:.2f} MB.")
-
-                        # Extract hashtags and mentions
-            hashtags, mentions, external_links = [], [], []
             # Parse facets (rich text features like links, mentions, etc.)
-            if hasattr(record, 'facets') and record.facets:
-                for facet in record.facets:
-                    if hasattr(facet, 'features'):
-                        for feature in facet.features:
-                            if hasattr(feature, 'py_type'):
-                                feature_type = getattr(feature, 'py_type')
-                                if feature_type == 'app.bsky.richtext.facet#tag':
-                                    hashtags.append(feature.tag if hasattr(feature, 'tag') else '')
-                                elif feature_type == 'app.bsky.richtext.facet#mention':
-                                    mentions.append(feature.did if hasattr(feature, 'did') else '')
-                                elif feature_type == 'app.bsky.richtext.facet#link':
-                                    external_links.append(feature.uri)
+            facet_values = dict(hashtags=[], mentions=[], external_links=[])
+            for facet in getattr(record, 'facets', None) or []:
+                for feature in getattr(facet, 'features', []):
+                    if field := FACET_FIELDS.get(getattr(feature, 'py_type', None)):
+                        target, attribute = field
+                        facet_values[target].append(getattr(feature, attribute, ''))
 
             # Check if this is a reply
             is_reply, reply_to = False, None
             if hasattr(record, 'reply'):
                 is_reply = True
                 # Get the parent post's author
-                if hasattr(record.reply, 'parent') and hasattr(record.reply.parent, 'uri'):
-                    parent_uri = record.reply.parent.uri
-                    post_id = parent_uri.split('/')[-1]
+                if parent_uri := getattr(getattr(record.reply, 'parent', None), 'uri', None):
+                    post_id = parent_uri.rpartition('/')[2]
                     reply_to_post = (await self.client.get_posts([parent_uri])).posts[0]
                     reply_to_author = reply_to_post.author
                     reply_to = f"https://bsky.app/profile/{reply_to_author.handle}/post/{post_id}"
@@ -139,17 +159,17 @@ Likes: {like_count} - Comments: {comment_count} - Shares: {share_count}
         except RequestErrorBase as e:
             response = e.response
             code = response.status_code
-            if code in [400, 404]:
+            if code in UNAVAILABLE_STATUS_CODES:
                 raise TargetUnavailableError("Post is unavailable.")
             else:
                 raise
 
     async def _retrieve_profile(self, url: str, session: aiohttp.ClientSession) -> MultimodalSequence:
         """Retrieve a profile from the given Bluesky URL."""
-        profile = await self.client.get_profile(url.split('/')[-1])
+        profile = await self.client.get_profile(url.rpartition('/')[2])
 
-        avatar = await download_image(profile.avatar, session) if profile.avatar else None
-        banner = await download_image(profile.banner, session) if profile.banner else None
+        avatar, banner = await asyncio.gather(download_optional_image(profile.avatar, session),
+                                              download_optional_image(profile.banner, session))
 
         text = f"""**Profile on Bluesky**
 User: {profile.display_name} (@{profile.handle})
@@ -176,6 +196,7 @@ Metrics:
             return True
         except Exception as e:
             logger.error(f"❌ Error authenticating with Bluesky: {str(e)}")
+            self.connected = False
             return False
 
     async def _construct_uri(self, url: str) -> str | None:
@@ -183,22 +204,10 @@ Metrics:
         https://bsky.app/profile/username.bsky.social/post/abcdef123"""
         try:
             # Parse URL to extract components for building the AT URI
-            parts = url.split('/')
-            if len(parts) < 5 or "bsky.app" not in url:
-                raise Exception(f"Invalid Bluesky URL format for {url}.")
-
-            # Find the profile part of the URL
-            profile_idx = -1
-            for i, part in enumerate(parts):
-                if part == "profile":
-                    profile_idx = i
-                    break
-
-            if profile_idx < 0 or profile_idx + 3 >= len(parts):
+            match = BSKY_POST_URL_REGEX.search(url)
+            if not match:
                 raise Exception(f"Could not extract profile or post ID from {url}.")
-
-            handle = parts[profile_idx + 1]
-            post_id = parts[profile_idx + 3]
+            handle, post_id = match.groups()
 
             # Resolve the handle to a DID
             did = await self._resolve_handle(handle)
@@ -213,9 +222,25 @@ Metrics:
             logger.error(f"Error retrieving Bluesky post: {err_msg}")
 
     async def _resolve_handle(self, handle: str) -> str:
-        """Resolve a handle to a DID."""
+        """Resolve a handle to a DID. Caches successful resolutions. Concurrent
+        calls for the same handle share a single request."""
+        if did := self.did_cache.get(handle):
+            self.did_cache.move_to_end(handle)
+            return did
+
+        task = self.pending_resolutions.get(handle)
+        if task is None:
+            task = asyncio.create_task(self._fetch_did(handle))
+            self.pending_resolutions[handle] = task
+            task.add_done_callback(lambda _: self.pending_resolutions.pop(handle, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_did(self, handle: str) -> str:
         try:
             response = await self.client.resolve_handle(handle)
+            self.did_cache[handle] = response.did
+            if len(self.did_cache) > MAX_CACHED_DIDS:
+                self.did_cache.popitem(last=False)  # Evict the least recently used handle
             return response.did
         except Exception as e:
             err_msg = error_to_string(e)
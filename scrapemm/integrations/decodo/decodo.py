@@ -1,10 +1,12 @@
 import asyncio
 import logging
+import random
 from typing import Optional
 
 import aiohttp
 from aiohttp import ClientConnectorError
 from ezmm import MultimodalSequence
+from yarl import URL
 
 from scrapemm import RateLimitError, RetrievalFailed
 from scrapemm.secrets import get_secret
@@ -13,27 +15,43 @@ from scrapemm.integrations.decodo.html_postprocessor import domain_to_postproces
 
 logger = logging.getLogger("scrapeMM")
 
+# Decodo responses embed entire HTML pages, so use the faster orjson parser if installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 # Domains which require more advanced scraping
 PREMIUM_PROXY_DOMAINS = {
     "snopes.com"
 }
 
+# Maximum number of simultaneous requests to the Decodo API. Bursting beyond it
+# only provokes 429s whose backoffs cost more than waiting for a free slot.
+MAX_CONCURRENT_REQUESTS = 10
+
 
 class Decodo:
     """Scrapes web content using Decodo's Web Scraping API with proxy support
     and JavaScript rendering capabilities."""
 
-    DECODO_API_URL = "https://scraper-api.decodo.com/v2/scrape"
+    DECODO_API_URL = URL("https://scraper-api.decodo.com/v2/scrape")  # Parsed once instead of on every request
 
     def __init__(self):
         self.basic_auth_token = None
+        self.headers = None
         self.n_scrapes = 0
+        self._semaphore: Optional[tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
 
     def _load_token(self):
         """Loads Decodo credentials from the secrets manager."""
         self.basic_auth_token = get_secret("decodo_token")
 
         if self.basic_auth_token:
+            self.headers = {
+                'Content-Type': 'application/json',
+                'Authorization': f'Basic {self.basic_auth_token}',
+            }
             logger.info("✅ Decodo token set.")
         else:
             logger.warning("⚠️ Decodo auth token not found. Please configure it in secrets.")
@@ -42,6 +60,14 @@ class Decodo:
         """Checks if Decodo credentials are available."""
         return bool(self.basic_auth_token)
 
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Returns the semaphore limiting concurrent API requests. Semaphores are bound
+        to an event loop, so a new one is created per loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS))
+        return self._semaphore[1]
+
     async def scrape(
             self, url: str,
             session: aiohttp.ClientSession,
@@ -109,11 +135,6 @@ class Decodo:
         Returns:
             HTML content as a string, or None if scraping failed
         """
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Basic {self.basic_auth_token}',
-        }
-
         # Build request payload
         # Note: For simple URL scraping, we just provide the URL
         # The "target" parameter is only used for specific templates like "google_search"
@@ -131,86 +152,89 @@ class Decodo:
 
         # Retry loop with exponential backoff
         for attempt in range(max_retries + 1):
+            retry_after = None
             try:
-                async with session.post(
-                        self.DECODO_API_URL,
-                        json=payload,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=timeout)
-                ) as response:
-                    # Validate response health
-                    if response.status != 200:
-                        logger.debug(f"Communication with Decodo API failed. Status code: {response.status}")
-
-                        if response.status == 429:  # Rate limit
-                            if attempt >= max_retries:
-                                logger.warning(f"Error 429: Rate limit hit and maximum retries reached.")
-                                raise RateLimitError(f"Decodo rate limit hit (despite {max_retries} retries).")
-                        elif response.status == 613:
-                            if attempt >= max_retries:
-                                raise RuntimeError(f"Decodo API error 613 (despite {max_retries} retries).")
-                        elif response.status == 502:  # Bad gateway
-                            if attempt >= max_retries:
-                                logger.warning(f"Error 502: Bad gateway and maximum retries reached.")
-                                raise RuntimeError(
-                                    f"Decodo API error 502: Bad gateway (despite {max_retries} retries).")
-
-                        else:  # Other errors that don't go away on retry
-                            match response.status:
-                                case 400:
-                                    logger.debug(
-                                        "Error 400: Bad request. If you use JavaScript, make sure you have the "
-                                        "Advanced plan subscription.")
-                                case 401:
-                                    logger.error("Error 401: Unauthorized. Check your Decodo credentials.")
-                                case 402:
-                                    logger.error("Error 402: Payment required. Check your Decodo subscription.")
-                                case 403:
-                                    logger.debug("Error 403: Forbidden.")
-                                case 408:
-                                    logger.warning("Error 408: Timeout! Website did not respond in time.")
-                                case 500:
-                                    logger.debug("Error 500: Server error.")
-                                case _:
-                                    logger.debug(f"Error {response.status}: {response.reason}.")
-                            raise RuntimeError(f"Decodo returned error {response.status}: {response.reason}")
-
-                    else:
-                        # Parse response
-                        json_response = await response.json()
-
-                        # Validate if scrape was successful
-                        if json_response.get("status") == "failed":
-                            status_code = json_response.get("status_code")
-                            message = json_response.get("message")
-                            logger.info(f"Decodo failed to scrape {url}: Error {status_code}: {message}")
-                            raise RetrievalFailed(f"Decodo failed with error {status_code}: {message}")
-
-                        # Extract HTML content from results
-                        if "results" in json_response and len(json_response["results"]) > 0:
-                            result = json_response["results"][0]
-
-                            # Check status code from the actual request
-                            status_code = result.get("status_code")
-                            if status_code and status_code >= 400:
-                                msg = f"Target website returned status {status_code} for {url}"
-                                logger.warning(msg)
-                                raise RetrievalFailed(msg)
+                async with self._get_semaphore():
+                    async with session.post(
+                            self.DECODO_API_URL,
+                            json=payload,
+                            headers=self.headers,
+                            timeout=aiohttp.ClientTimeout(total=timeout)
+                    ) as response:
+                        # Validate response health
+                        if response.status != 200:
+                            logger.debug(f"Communication with Decodo API failed. Status code: {response.status}")
+
+                            if response.status == 429:  # Rate limit
+                                if attempt >= max_retries:
+                                    logger.warning(f"Error 429: Rate limit hit and maximum retries reached.")
+                                    raise RateLimitError(f"Decodo rate limit hit (despite {max_retries} retries).")
+                                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                            elif response.status == 613:
+                                if attempt >= max_retries:
+                                    raise RuntimeError(f"Decodo API error 613 (despite {max_retries} retries).")
+                            elif response.status == 502:  # Bad gateway
+                                if attempt >= max_retries:
+                                    logger.warning(f"Error 502: Bad gateway and maximum retries reached.")
+                                    raise RuntimeError(
+                                        f"Decodo API error 502: Bad gateway (despite {max_retries} retries).")
+
+                            else:  # Other errors that don't go away on retry
+                                match response.status:
+                                    case 400:
+                                        logger.debug(
+                                            "Error 400: Bad request. If you use JavaScript, make sure you have the "
+                                            "Advanced plan subscription.")
+                                    case 401:
+                                        logger.error("Error 401: Unauthorized. Check your Decodo credentials.")
+                                    case 402:
+                                        logger.error("Error 402: Payment required. Check your Decodo subscription.")
+                                    case 403:
+                                        logger.debug("Error 403: Forbidden.")
+                                    case 408:
+                                        logger.warning("Error 408: Timeout! Website did not respond in time.")
+                                    case 500:
+                                        logger.debug("Error 500: Server error.")
+                                    case _:
+                                        logger.debug(f"Error {response.status}: {response.reason}.")
+                                raise RuntimeError(f"Decodo returned error {response.status}: {response.reason}")
 
-                            html_content = result.get("content")
-                            if html_content:
-                                self.n_scrapes += 1
-                                logger.debug(f"Successfully scraped {url} with Decodo (scrape #{self.n_scrapes})")
-                                return html_content
+                        else:
+                            # Parse response
+                            json_response = await response.json(loads=json_loads)
+
+                            # Validate if scrape was successful
+                            if json_response.get("status") == "failed":
+                                status_code = json_response.get("status_code")
+                                message = json_response.get("message")
+                                logger.info(f"Decodo failed to scrape {url}: Error {status_code}: {message}")
+                                raise RetrievalFailed(f"Decodo failed with error {status_code}: {message}")
+
+                            # Extract HTML content from results
+                            if "results" in json_response and len(json_response["results"]) > 0:
+                                result = json_response["results"][0]
+
+                                # Check status code from the actual request
+                                status_code = result.get("status_code")
+                                if status_code and status_code >= 400:
+                                    msg = f"Target website returned status {status_code} for {url}"
+                                    logger.warning(msg)
+                                    raise RetrievalFailed(msg)
+
+                                html_content = result.get("content")
+                                if html_content:
+                                    self.n_scrapes += 1
+                                    logger.debug(f"Successfully scraped {url} with Decodo (scrape #{self.n_scrapes})")
+                                    return html_content
+                                else:
+                                    msg = f"No content in Decodo response for {url}"
+                                    logger.warning(msg)
+                                    raise RetrievalFailed(msg)
                             else:
-                                msg = f"No content in Decodo response for {url}"
+                                msg = f"No results in Decodo response for {url}"
                                 logger.warning(msg)
+                                logger.debug("Response: %s", json_response)  # Formatted only if debug logging is enabled
                                 raise RetrievalFailed(msg)
-                        else:
-                            msg = f"No results in Decodo response for {url}"
-                            logger.warning(msg)
-                            logger.debug(f"Response: {json_response}")
-                            raise RetrievalFailed(msg)
 
             except ClientConnectorError:  # Decodo sometimes has hiccups
                 if attempt >= max_retries:
@@ -226,18 +250,30 @@ class Decodo:
                 logger.debug(f"Error while scraping with Decodo: {e}")
                 raise
 
-            await backoff(attempt)  # Wait before retrying
+            await backoff(attempt, retry_after)  # Wait before retrying
 
         # Should not reach here, but return None as fallback
         return None
 
 
-async def backoff(n_past_attempts: int):
-    """Exponential backoff: 2^n_past_attempts seconds (1s, 2s, 4s, 8s, 16s...)"""
-    wait_time = 2 ** n_past_attempts
+async def backoff(n_past_attempts: int, retry_after: Optional[float] = None):
+    """Waits for the server-specified Retry-After time if given, otherwise backs off
+    exponentially: 2^n_past_attempts seconds (1s, 2s, 4s, 8s, 16s...). Adds up to 1s
+    of random jitter so that concurrent requests do not retry in lockstep."""
+    wait_time = retry_after if retry_after is not None else 2 ** n_past_attempts
+    wait_time += random.random()
     logger.debug(f"Backing off for {wait_time:.0f}s before retrying...")
     await asyncio.sleep(wait_time)
 
 
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds. Returns None if missing or
+    given in another format (e.g., as HTTP date)."""
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
 # Create a singleton instance
 decodo = Decodo()
@@ -14,7 +14,7 @@ from scrapemm import RateLimitError
 from scrapemm.common import CONFIG_DIR
 from scrapemm.common.exceptions import ContentBlockedError, TargetUnavailableError, IPBannedError
 from scrapemm.download import download_image
-from scrapemm.download.common import HEADERS
+from scrapemm.download.common import HEADERS, make_session
 from scrapemm.common.retrieval_integration import RetrievalIntegration
 from scrapemm.integrations.ytdlp import get_content_with_ytdlp
 from scrapemm.secrets import get_secret
@@ -22,7 +22,7 @@ from scrapemm.util import parse_netscape_cookies, postprocess_markdown
 
 logger = logging.getLogger("scrapeMM")
 
-VIDEO_URL_REGEX = r"facebook\.com/\d+/videos/\d+/?"
+POST_PERMALINK_REGEX = re.compile(r"facebook\.com/.+/posts/.+")
 LIKE_COMMENT_SHARE_SVG_REGEX = (
     r"['\"]?%[0-9A-Fa-f]{2}.*?(?:%3C/svg%3E|%3C%2Fsvg%3E)['\"]?"
 )
@@ -177,10 +177,10 @@ class Facebook(RetrievalIntegration):
             )
             return MultimodalSequence(photos)
 
-        return await self._get_photo_from_regular_post(url, cookies)
+        return await self._get_photo_from_regular_post(url, cookies, session=kwargs.get("session"))
 
     async def _get_photo_from_regular_post(
-            self, url, cookies: list[dict[str, str]]
+            self, url, cookies: list[dict[str, str]], session: aiohttp.ClientSession | None = None
     ) -> MultimodalSequence:
         image_url = None
         async with async_playwright() as p:
@@ -215,7 +215,10 @@ class Facebook(RetrievalIntegration):
         if not image_url:
             raise TargetUnavailableError("Could not locate image on Facebook photo page.")
 
-        async with aiohttp.ClientSession(headers=HEADERS) as session:
+        if session is None:
+            async with make_session() as session:
+                image = await download_image(image_url, session)
+        else:
             image = await download_image(image_url, session)
 
         if not image:
@@ -257,7 +260,7 @@ class Facebook(RetrievalIntegration):
                 await browser.close()
 
             photos = [
-                await self._get_photo_from_regular_post(href, cookies)
+                await self._get_photo_from_regular_post(href, cookies, session=kwargs.get("session"))
                 for href in photo_hrefs
             ]
 
@@ -265,7 +268,7 @@ class Facebook(RetrievalIntegration):
 
     def _is_post_permalink(self, url: str) -> bool:
         """Checks if the URL is a Facebook post permalink URL."""
-        return re.search(r"facebook\.com/.+/posts/.+", url) is not None
+        return POST_PERMALINK_REGEX.search(url) is not None
 
     def _collect_photo_hrefs_from_html(self, html: str) -> list[str]:
         """Collects all photo hrefs from the given HTML string."""
@@ -294,11 +297,10 @@ class Facebook(RetrievalIntegration):
     def _is_video_url(self, url: str) -> bool:
         """Checks if the URL is a Facebook video URL."""
         # video URLS are in the format: https://www.facebook.com/watch?v=VIDEO_ID or fb.watch/...
-        # or Reels: https://www.facebook.com/reel/REEL_ID
+        # or Reels: https://www.facebook.com/reel/REEL_ID or https://www.facebook.com/USER_ID/videos/VIDEO_ID
         return (
                 "facebook.com/watch" in url
                 or "facebook.com/reel" in url
-                or bool(re.search(VIDEO_URL_REGEX, url))
                 or "fb.watch" in url
                 or "/videos/" in url
         )
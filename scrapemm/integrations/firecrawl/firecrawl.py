@@ -11,7 +11,7 @@ from requests.exceptions import RetryError
 
 from scrapemm.common import get_config_var, update_config
 from scrapemm.common.exceptions import UnsupportedDomainError, TargetUnavailableError
-from scrapemm.download.common import HEADERS
+from scrapemm.download.common import HEADERS, make_session
 from scrapemm.util import read_urls_from_file, get_domain, to_multimodal_sequence, html2md
 
 logger = logging.getLogger("scrapeMM")
@@ -25,7 +25,7 @@ if config_url := get_config_var("firecrawl_url"):
     FIRECRAWL_URLS = [config_url] + FIRECRAWL_URLS
 
 NO_BOT_DOMAINS_FILE_PATH = Path(__file__).parent / "no_bot_domains.txt"
-NO_BOT_DOMAINS = read_urls_from_file(NO_BOT_DOMAINS_FILE_PATH)
+NO_BOT_DOMAINS = frozenset(read_urls_from_file(NO_BOT_DOMAINS_FILE_PATH))
 
 NO_AD_BLOCKING_DOMAINS = {
     "snopes.com"
@@ -62,6 +62,7 @@ class Firecrawl:
     def __init__(self):
         self.n_scrapes = 0
         self._firecrawl = None
+        self._connecting: Optional[asyncio.Task] = None
 
     async def connect(self):
         from firecrawl import AsyncFirecrawl
@@ -71,6 +72,13 @@ class Firecrawl:
             logger.info(f"✅ Detected Firecrawl running at {self.firecrawl_url}.")
         self._firecrawl = AsyncFirecrawl(api_url=self.firecrawl_url)
 
+    async def _connect_once(self):
+        """Connects to Firecrawl, letting concurrent callers share the same
+        connection attempt instead of each locating Firecrawl on their own."""
+        if self._connecting is None or self._connecting.done():
+            self._connecting = asyncio.create_task(self.connect())
+        await asyncio.shield(self._connecting)
+
     async def scrape(self,
                      url: str,
                      session: aiohttp.ClientSession,
@@ -84,7 +92,7 @@ class Firecrawl:
             raise UnsupportedDomainError(f"Firecrawl cannot scrape sites from {domain}")
 
         if not self._firecrawl:
-            await self.connect()
+            await self._connect_once()
 
         # Throw an exception for unavailable URLs which would otherwise cause Firecrawl
         # to get stuck in an infinite loop.
@@ -108,7 +116,7 @@ class Firecrawl:
                 break
             except Exception as e:
                 # Ensure firecrawl is still running
-                state = await get_firecrawl_state(self.firecrawl_url)
+                state = await get_firecrawl_state(self.firecrawl_url, session)
                 if state == "unavailable":
                     logger.error(f"❌ Firecrawl stopped running at {self.firecrawl_url}.")
                     raise RuntimeError("Firecrawl stopped running.")
@@ -154,31 +162,42 @@ fire = Firecrawl()
 
 
 async def find_firecrawl(urls):
-    for url in urls:
-        if await firecrawl_is_running(url):
+    """Probes all URLs concurrently and returns the first one (in the given
+    order of priority) at which Firecrawl is running."""
+    async with make_session() as session:
+        running = await asyncio.gather(*[firecrawl_is_running(url, session) for url in urls])
+    for url, is_running in zip(urls, running):
+        if is_running:
             return url
     return None
 
 
-async def firecrawl_is_running(url: str) -> bool:
+async def firecrawl_is_running(url: str, session: aiohttp.ClientSession = None) -> bool:
     """Returns True iff Firecrawl can be successfully pinged at the specified URL."""
-    return await get_firecrawl_state(url) == "running"
+    return await get_firecrawl_state(url, session) == "running"
 
 
-async def get_firecrawl_state(url: str) -> str | None:
-    """Returns the state of Firecrawl at the specified URL."""
+async def get_firecrawl_state(url: str, session: aiohttp.ClientSession = None) -> str | None:
+    """Returns the state of Firecrawl at the specified URL. Re-uses the given
+    session if provided, otherwise opens a temporary one."""
     if not url:
         return None
     if not url.startswith("http"):
         url = "https://" + url
 
-    async with aiohttp.ClientSession(headers=HEADERS) as session:
-        # Retrieve the head of the homepage
-        try:
-            async with session.head(url, timeout=2) as response:
-                if 200 <= response.status < 400:
-                    return "running"
-        except (ReadTimeout, asyncio.TimeoutError):
-            return "busy"
-        except (aiohttp.ClientError, ConnectionError, RetryError):
-            return "unavailable"
+    if session is None:
+        async with make_session() as session:
+            return await _probe_firecrawl(url, session)
+    return await _probe_firecrawl(url, session)
+
+
+async def _probe_firecrawl(url: str, session: aiohttp.ClientSession) -> str | None:
+    # Retrieve the head of the homepage
+    try:
+        async with session.head(url, timeout=2) as response:
+            if 200 <= response.status < 400:
+                return "running"
+    except (ReadTimeout, asyncio.TimeoutError):
+        return "busy"
+    except (aiohttp.ClientError, ConnectionError, RetryError):
+        return "unavailable"
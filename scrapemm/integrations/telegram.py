@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from pathlib import Path
 from typing import Optional
@@ -121,23 +122,25 @@ Forwards: {message.forwards}{reactions_text}
             search_ids = list(range(original_post.id - max_amp, original_post.id + max_amp + 1))
             posts = await self.client.get_messages(chat, ids=search_ids)
 
-        # Download media of posts that belong to the same group
+        # Download media of posts that belong to the same group, all at once
+        group_posts = [post for post in posts
+                       if post is not None and post.grouped_id == original_post.grouped_id and post.media]
+        media_bytes = await asyncio.gather(*[self.client.download_media(post, file=bytes) for post in group_posts])
+
         media = []
-        for post in posts:
-            if post is not None and post.grouped_id == original_post.grouped_id:
-                if medium := post.media:
-                    post_url = f"https://t.me/{chat.username}/{post.id}"
-                    medium_bytes = await self.client.download_media(post, file=bytes)
-                    if hasattr(medium, "photo"):
-                        item = Image(binary_data=medium_bytes, source_url=post_url)
-                    elif hasattr(medium, "video"):
-                        item = Video(binary_data=medium_bytes, source_url=post_url)
-                        if max_video_size is not None and item.size > max_video_size:
-                            logger.info(f"Removing video {item.reference} because it exceeds the maximum size "
-                                        f"of {max_video_size / 1024 / 1024:.2f} MB.")
-                            item = None
-                    else:
-                        raise ValueError(f"Unsupported medium: {medium.__dict__}")
-                    media.append(item)
+        for post, medium_bytes in zip(group_posts, media_bytes):
+            medium = post.media
+            post_url = f"https://t.me/{chat.username}/{post.id}"
+            if hasattr(medium, "photo"):
+                item = Image(binary_data=medium_bytes, source_url=post_url)
+            elif hasattr(medium, "video"):
+                item = Video(binary_data=medium_bytes, source_url=post_url)
+                if max_video_size is not None and item.size > max_video_size:
+                    logger.info(f"Removing video {item.reference} because it exceeds the maximum size "
+                                f"of {max_video_size / 1024 / 1024:.2f} MB.")
+                    continue
+            else:
+                raise ValueError(f"Unsupported medium: {medium.__dict__}")
+            media.append(item)
 
         return media
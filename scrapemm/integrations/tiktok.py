@@ -1,7 +1,7 @@
 import asyncio
 import logging
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from urllib.parse import urlparse
 
 import aiohttp
@@ -17,6 +17,10 @@ from scrapemm.secrets import get_secret
 
 logger = logging.getLogger("scrapeMM")
 
+VIDEO_ID_REGEX = re.compile(r'/video/(\d+)')
+NUMERIC_ID_REGEX = re.compile(r'/\d{10,}')
+USERNAME_REGEX = re.compile(r'/@([^/?]+)')
+
 
 class TikTok(RetrievalIntegration):
     """Integration for TikTok to retrieve videos and metadata.
@@ -84,43 +88,59 @@ class TikTok(RetrievalIntegration):
             raise TargetUnavailableError("TikTok video not available.")
 
         try:
-            # Create criteria to search for the specific video ID
-            query_criteria = Criteria(
-                operation="EQ",
-                field_name="video_id",
-                field_values=[video_id]
-            )
-            query = Query(and_criteria=[query_criteria])
-
-            # Define the fields we want to retrieve
-            video_fields = "id,create_time,username,region_code,video_description,video_duration,hashtag_names,view_count,like_count,comment_count,share_count,music_id,voice_to_text"
-
-            # Create the video request
-            video_request = QueryVideoRequest(
-                fields=video_fields,
-                query=query,
-                max_count=1,
-                start_date="20200101",
-                end_date=datetime.now().strftime("%Y%m%d"),
+            # Query the API for metadata while downloading the video using yt-dlp
+            video_data, download = await asyncio.gather(
+                self._query_video_data(video_id),
+                download_video_with_ytdlp(url, session, max_video_size=max_video_size),
+                return_exceptions=True
             )
-
-            # Execute the query asynchronously (API call is synchronous/blocking)
-            videos, search_id, cursor, has_more, start_date, end_date = await asyncio.to_thread(
-                self.api.query_videos,
-                video_request,
-                fetch_all_pages=False,
-            )
-
-            video_data = videos[0] if videos else None
-
-            # Download the video using yt-dlp
-            video, thumbnail, metadata = await download_video_with_ytdlp(url, session, max_video_size=max_video_size)
+            if isinstance(download, BaseException):
+                raise download
+            video, thumbnail, metadata = download
+            if isinstance(video_data, BaseException):
+                # The metadata from yt-dlp suffices, no need to discard the downloaded video
+                logger.debug(f"TikTok API query failed for video {video_id}, using yt-dlp metadata: {video_data}")
+                video_data = None
 
             return await self._create_video_sequence_from_api(video_data or metadata, video, thumbnail)
 
         except Exception as e:
             raise RuntimeError(f"Error retrieving TikTok video: {e}")
 
+    async def _query_video_data(self, video_id: str) -> dict | None:
+        """Retrieves the video's metadata via the TikTok Research API, if available."""
+        if not self.api_available:
+            return None
+
+        # Create criteria to search for the specific video ID
+        query_criteria = Criteria(
+            operation="EQ",
+            field_name="video_id",
+            field_values=[video_id]
+        )
+        query = Query(and_criteria=[query_criteria])
+
+        # Define the fields we want to retrieve
+        video_fields = "id,create_time,username,region_code,video_description,video_duration,hashtag_names,view_count,like_count,comment_count,share_count,music_id,voice_to_text"
+
+        # Create the video request
+        video_request = QueryVideoRequest(
+            fields=video_fields,
+            query=query,
+            max_count=1,
+            start_date="20200101",
+            end_date=datetime.now().strftime("%Y%m%d"),
+        )
+
+        # Execute the query asynchronously (API call is synchronous/blocking)
+        videos, search_id, cursor, has_more, start_date, end_date = await asyncio.to_thread(
+            self.api.query_videos,
+            video_request,
+            fetch_all_pages=False,
+        )
+
+        return videos[0] if videos else None
+
     async def _get_user_profile(self, url: str, session: aiohttp.ClientSession) -> MultimodalSequence:
         """Retrieves profile using TikTok Research API."""
         username = self._extract_username(url)
@@ -145,6 +165,8 @@ class TikTok(RetrievalIntegration):
         username = metadata.get('username') or metadata.get('uploader', 'Unknown')
         description = metadata.get('video_description') or metadata.get('description', '')
         create_time = metadata.get('create_time') or metadata.get('upload_date', 'Unknown')
+        if isinstance(create_time, int):  # The Research API returns a UTC Unix timestamp
+            create_time = datetime.fromtimestamp(create_time, tz=timezone.utc).strftime("%B %d, %Y at %H:%M UTC")
         duration = metadata.get('video_duration') or metadata.get('duration', 0)
         view_count = metadata.get('view_count', 0)
         like_count = metadata.get('like_count', 0)
@@ -211,7 +233,7 @@ Metrics:
 
     def _is_video_url(self, url: str) -> bool:
         """Determines if the URL is a TikTok video URL."""
-        return '/video/' in url or 'vm.tiktok.com' in url or re.search(r'/\d{10,}', url)
+        return '/video/' in url or 'vm.tiktok.com' in url or NUMERIC_ID_REGEX.search(url) is not None
 
     def _extract_video_id(self, url: str) -> str | None:
         """Extracts the video ID from a TikTok URL."""
@@ -222,7 +244,7 @@ Metrics:
                 if path_parts and path_parts[0]:
                     return path_parts[0]
             else:
-                match = re.search(r'/video/(\d+)', url)
+                match = VIDEO_ID_REGEX.search(url)
                 if match:
                     return match.group(1)
 
@@ -240,7 +262,7 @@ Metrics:
     def _extract_username(self, url: str) -> str | None:
         """Extracts the username from a TikTok profile URL."""
         try:
-            match = re.search(r'/@([^/?]+)', url)
+            match = USERNAME_REGEX.search(url)
             if match:
                 return match.group(1)
 
@@ -1,23 +1,51 @@
 import asyncio
 import logging
 import re
+import time
+from functools import lru_cache
 from typing import Optional
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, urlsplit, parse_qs
+from weakref import WeakKeyDictionary
 
 import aiohttp
-from ezmm import MultimodalSequence
-from tweepy import Tweet, User, TooManyRequests, HTTPException
+from ezmm import MultimodalSequence, Item
+from tweepy import Tweet, User, Media, TooManyRequests, HTTPException
 from tweepy.asynchronous import AsyncClient
 
 import scrapemm.common
 from scrapemm.common.exceptions import RateLimitError, TargetUnavailableError, QuotaExceededError
-from scrapemm.download import download_image, download_video
+from scrapemm.download import download_image, download_optional_image, download_video
 from scrapemm.common.retrieval_integration import RetrievalIntegration
 from scrapemm.secrets import get_secret
 from scrapemm.util import unshorten
 
 logger = logging.getLogger("scrapeMM")
 
+TCO_LINK_REGEX = re.compile(r"https?://t\.co/\S+")
+TWEET_PATH_REGEX = re.compile(r"/[^/]+/status/(\d+)(?:/(?:photo|video)/(\d+))?/?")
+TWEET_BATCH_SIZE = 100  # Maximum number of tweet IDs the API accepts per lookup
+TWEET_BATCH_DELAY = 0.02  # Seconds to wait for further lookups before sending a batch
+TWEET_CACHE_TTL = 300  # Seconds for which a looked-up tweet is re-used
+USER_CACHE_TTL = 1800  # Profiles change rarely, so they are re-used for longer
+API_CACHE_SIZE = 1024  # Maximum number of cached tweets and users, each
+
+# Request parameters, pre-joined as Tweepy passes strings through unchanged. Only expand what is used
+TWEET_EXPANSIONS = "author_id,attachments.media_keys"
+TWEET_MEDIA_FIELDS = "url,variants"
+TWEET_FIELDS = "created_at,public_metrics,author_id,attachments"
+# The fields "parody" and "verified_followers_count" are fairly new. See
+# https://x.com/Safety/status/1877581125608153389
+# and https://x.com/XDevelopers/status/1865180409425715202
+USER_FIELDS = ("created_at,description,location,parody,profile_banner_url,profile_image_url,protected,"
+               "public_metrics,url,verified,verified_followers_count,verified_type,withheld")
+
+# Boolean user fields and how to label them if set
+USER_PROPERTY_FLAGS = (
+    ("protected", "Protected"),
+    ("withheld", "Withheld"),
+    ("parody", "Marked as parody"),
+)
+
 
 class X(RetrievalIntegration):
     """The X (Twitter) integration. Requires "Basic" API access to work. For more info, see
@@ -45,6 +73,14 @@ class X(RetrievalIntegration):
         bearer_token = get_secret("x_bearer_token")
         if bearer_token:
             self.client = AsyncClient(bearer_token=bearer_token, wait_on_rate_limit=scrapemm.common.WAIT_ON_RATE_LIMIT)
+            # API clients per caller session, dropped together with the session
+            self.session_clients: WeakKeyDictionary[aiohttp.ClientSession, AsyncClient] = WeakKeyDictionary()
+            # Tweet lookups awaiting the next batch, per session, with the client and the flush timer
+            self.pending_lookups: dict[aiohttp.ClientSession, tuple[AsyncClient, list[tuple[int, asyncio.Future]],
+                                                                 asyncio.TimerHandle]] = {}
+            self.batch_tasks: set[asyncio.Task] = set()  # Keeps running batch requests referenced
+            self.tweet_cache: dict[int, tuple[float, tuple[Tweet, User, list[Media]]]] = {}
+            self.user_cache: dict[str, tuple[float, User]] = {}
             self.connected = True
             logger.info("✅ Successfully connected to X.")
         else:
@@ -61,9 +97,10 @@ class X(RetrievalIntegration):
             raise ValueError("X search URLs are not supported by the X integration.")
 
         tweet_id, media_number = extract_tweet_id_from_url(url)
+        client = self._get_client(session)
         try:
             if tweet_id:
-                tweet_content = await self._get_tweet(tweet_id, session, max_video_size)
+                tweet_content = await self._get_tweet(client, tweet_id, session, max_video_size)
                 if media_number is not None:
                     media = list(tweet_content.unique_items())
                     return MultimodalSequence(media[media_number - 1])
@@ -72,7 +109,7 @@ class X(RetrievalIntegration):
             else:
                 username = extract_username_from_url(url)
                 if username:
-                    return await self._get_user(username, session)
+                    return await self._get_user(client, username, session)
         except TooManyRequests:
             raise RateLimitError("X API rate limit reached.")
         except HTTPException as e:
@@ -88,6 +125,20 @@ class X(RetrievalIntegration):
 
         raise TargetUnavailableError(f"Could not retrieve X content from {url}.")
 
+    def _get_client(self, session: aiohttp.ClientSession) -> AsyncClient:
+        """Returns an API client that sends its requests over the connection pool of the given
+        session. Without a session, Tweepy opens (and closes) a new one for every single API call,
+        paying the TCP and TLS handshakes each time. Relies on the AsyncClient.session attribute
+        of Tweepy 4.17 (see pyproject.toml), which AsyncClient.request() uses if set."""
+        if (client := self.session_clients.get(session)) is None:
+            client = AsyncClient(bearer_token=self.client.bearer_token,
+                                 wait_on_rate_limit=self.client.wait_on_rate_limit)
+            # A session of its own shares the connections but not the browser headers meant for web pages.
+            # Its connector belongs to the given session, which closes it
+            client.session = aiohttp.ClientSession(connector=session.connector, connector_owner=False)
+            self.session_clients[session] = client
+        return client
+
     async def _normalize(self, url: str, session: aiohttp.ClientSession) -> str:
         """Turns URLs of the form https://publish.twitter.com/?query=...
         into the bare Twitter URL."""
@@ -102,72 +153,114 @@ class X(RetrievalIntegration):
             return parse_qs(query).get("query", [])[0] or url
         return url
 
-    async def _get_tweet(self, tweet_id: int, session: aiohttp.ClientSession, max_video_size: int = None) -> MultimodalSequence:
+    async def _get_tweet(self, client: AsyncClient, tweet_id: int, session: aiohttp.ClientSession,
+                         max_video_size: int = None) -> MultimodalSequence:
         """Returns a MultimodalSequence containing the tweet's text and media
         along with information like metrics, etc."""
 
-        response = await self.client.get_tweet(
-            id=tweet_id,
-            expansions=["author_id", "attachments.media_keys", "geo.place_id",
-                        "edit_history_tweet_ids"],
-            media_fields=["url", "variants"],
-            tweet_fields=["created_at", "public_metrics"],
-        )
-        tweet: Tweet = response.data
+        tweet, author, media_raw = await self._lookup_tweet(client, tweet_id)
 
         if not tweet:
             raise TargetUnavailableError(f"Tweet {tweet_id} not found.")
 
-        media_raw = response.includes.get("media")
-        author = response.includes.get("users")[0]
         metrics = tweet.public_metrics
 
         # Post-process text
         text = tweet.text
-        text = re.sub(r"https?://t\.co/\S+", "", text).strip()
-
-        # Download the media
-        media = []
-        if media_raw:
-            for medium_raw in media_raw:
-                medium = None
-                if medium_raw.type == "photo":
-                    url = medium_raw.url
-                    medium = await download_image(url, session=session)
-                elif medium_raw.type in ["video", "animated_gif"]:
-                    # Get the variant with the highest bitrate
-                    url = _get_best_quality_video_url(medium_raw.variants)
-                    if url:
-                        medium = await download_video(url, session=session)
-                        if medium and max_video_size and medium.size > max_video_size:
-                            logger.info(f"Removing video {medium.reference} because it exceeds the maximum size "
-                                        f"of {max_video_size / 1024 / 1024:.2f} MB.")
-                            medium = None
-                else:
-                    raise ValueError(f"Unsupported media type: {medium_raw.type}")
-                if medium:
-                    media.append(medium)
+        if "t.co/" in text:
+            text = TCO_LINK_REGEX.sub("", text)
+        text = text.strip()
+
+        # Download the media concurrently, keeping their order
+        media = await asyncio.gather(*[_download_medium(medium_raw, session, max_video_size)
+                                       for medium_raw in media_raw])
+        media = [medium for medium in media if medium]
+
+        # The author may be missing from the response, e.g., if suspended or withheld
+        author_str = f"{author.name}, @{author.username}" if author else "Unknown"
 
         tweet_str = f"""**Post on X**
-Author: {author.name}, @{author.username}
+Author: {author_str}
 Posted on: {tweet.created_at.strftime("%B %d, %Y at %H:%M")}
 Likes: {metrics['like_count']} - Retweets: {metrics['retweet_count']} - Replies: {metrics['reply_count']} - Views: {metrics['impression_count']}
 
 {text}"""  # TODO: Add edit history
         return MultimodalSequence([tweet_str, *media])
 
-    async def _get_user(self, username: str, session: aiohttp.ClientSession) -> MultimodalSequence:
+    async def _lookup_tweet(self, client: AsyncClient,
+                            tweet_id: int) -> tuple[Optional[Tweet], Optional[User], list[Media]]:
+        """Returns the tweet along with its author and attached media. Lookups issued at about
+        the same time are collected and sent as a single API request, saving round trips and
+        rate limit budget when retrieving many tweets at once. Only lookups using the same session
+        are batched together. Found tweets are cached for a while."""
+        if (cached := _get_cached(self.tweet_cache, tweet_id, TWEET_CACHE_TTL)) is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        session = client.session
+        if session not in self.pending_lookups:
+            timer = loop.call_later(TWEET_BATCH_DELAY, self._flush_lookups, session)
+            self.pending_lookups[session] = (client, [], timer)
+        lookups = self.pending_lookups[session][1]
+        lookups.append((tweet_id, future))
+        if len(lookups) >= TWEET_BATCH_SIZE:
+            self._flush_lookups(session)
+        result = await future
+        if result[0] is not None:
+            _put_cached(self.tweet_cache, tweet_id, result)
+        return result
+
+    def _flush_lookups(self, session: aiohttp.ClientSession):
+        """Sends all tweet lookups pending for the given session as one batch."""
+        if session not in self.pending_lookups:
+            return
+        client, batch, timer = self.pending_lookups.pop(session)
+        timer.cancel()  # No-op if the timer triggered this flush
+        task = asyncio.create_task(self._lookup_tweets(client, batch))
+        self.batch_tasks.add(task)
+        task.add_done_callback(self.batch_tasks.discard)
+
+    async def _lookup_tweets(self, client: AsyncClient, batch: list[tuple[int, asyncio.Future]]):
+        """Looks up the batch of tweets and resolves each lookup's future with its own tweet,
+        author and media."""
+        try:
+            response = await client.get_tweets(
+                ids=list(dict.fromkeys(tweet_id for tweet_id, _ in batch)),
+                expansions=TWEET_EXPANSIONS,
+                media_fields=TWEET_MEDIA_FIELDS,
+                tweet_fields=TWEET_FIELDS,
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        tweets = {tweet.id: tweet for tweet in response.data or []}
+        users = {user.id: user for user in response.includes.get("users", [])}
+        media = {medium.media_key: medium for medium in response.includes.get("media", [])}
+
+        for tweet_id, future in batch:
+            if future.done():
+                continue
+            tweet = tweets.get(tweet_id)
+            if tweet is None:
+                future.set_result((None, None, []))
+                continue
+            media_keys = (tweet.attachments or {}).get("media_keys", [])
+            future.set_result((tweet, users.get(tweet.author_id), [media[k] for k in media_keys if k in media]))
+
+    async def _get_user(self, client: AsyncClient, username: str,
+                        session: aiohttp.ClientSession) -> MultimodalSequence:
         """Returns a MultimodalSequence containing the user's profile information
         incl. profile image and profile banner."""
 
-        # The fields "parody" and "verified_followers_count" are fairly new. See
-        # https://x.com/Safety/status/1877581125608153389
-        # and https://x.com/XDevelopers/status/1865180409425715202
+        if user := _get_cached(self.user_cache, username.lower(), USER_CACHE_TTL):
+            return await _parse_user(user, session)
+
         try:
-            response = await self.client.get_user(username=username, user_fields=[
-                "created_at", "description", "location", "parody", "profile_banner_url", "profile_image_url",
-                "protected", "public_metrics", "url", "verified", "verified_followers_count", "verified_type", "withheld"
-            ])
+            response = await client.get_user(username=username, user_fields=USER_FIELDS)
         except Exception:
             raise TargetUnavailableError(f"X user @{username} apparently doesn't exist.")
 
@@ -175,19 +268,55 @@ Likes: {metrics['like_count']} - Retweets: {metrics['retweet_count']} - Replies:
         if not user:
             raise TargetUnavailableError(f"X user @{username} not found.")
 
+        _put_cached(self.user_cache, username.lower(), user)
         return await _parse_user(user, session)
 
 
+def _get_cached(cache: dict, key, ttl: float):
+    """Returns the cached value for the key unless it is missing or older than ttl seconds."""
+    if cached := cache.get(key):
+        cached_at, value = cached
+        if time.monotonic() - cached_at < ttl:
+            return value
+
+
+def _put_cached(cache: dict, key, value):
+    """Caches the value, dropping the oldest entry if the cache is full."""
+    cache.pop(key, None)
+    cache[key] = (time.monotonic(), value)
+    if len(cache) > API_CACHE_SIZE:
+        del cache[next(iter(cache))]
+
+
+async def _download_medium(medium_raw: Media, session: aiohttp.ClientSession,
+                           max_video_size: int = None) -> Optional[Item]:
+    if medium_raw.type == "photo":
+        return await download_image(medium_raw.url, session=session)
+    elif medium_raw.type in ["video", "animated_gif"]:
+        # Get the variant with the highest bitrate
+        url = _get_best_quality_video_url(medium_raw.variants)
+        if url:
+            medium = await download_video(url, session=session)
+            if medium and max_video_size and medium.size > max_video_size:
+                logger.info(f"Removing video {medium.reference} because it exceeds the maximum size "
+                            f"of {max_video_size / 1024 / 1024:.2f} MB.")
+                return None
+            return medium
+    else:
+        raise ValueError(f"Unsupported media type: {medium_raw.type}")
+
+
 async def _parse_user(user: User, session: aiohttp.ClientSession) -> MultimodalSequence:
     # Turn all the data into a multimodal sequence
-    profile_image = profile_banner = None
-    if profile_image_url := user.profile_image_url:
+    # Download the profile image and banner concurrently
+    profile_image_url = user.profile_image_url
+    if profile_image_url:
         profile_image_url = profile_image_url.replace("_normal", "")  # Use the original picture variant
-        profile_image = await download_image(profile_image_url, session)
-    if hasattr(user, "profile_banner_url"):
-        profile_banner_url = user.profile_banner_url
-        if profile_banner_url:
-            profile_banner = await download_image(profile_banner_url, session)
+    profile_banner_url = getattr(user, "profile_banner_url", None)
+    profile_image, profile_banner = await asyncio.gather(
+        download_optional_image(profile_image_url, session),
+        download_optional_image(profile_banner_url, session),
+    )
 
     verification_status_text = f"{'Verified' if user.verified else 'Not verified'}"
     if user.verified:
@@ -196,16 +325,12 @@ async def _parse_user(user: User, session: aiohttp.ClientSession) -> MultimodalS
     metrics = [f" - {k.capitalize().replace('_', ' ')}: {v}"
                for k, v in user.public_metrics.items()]
     metrics_text = "\n".join(metrics)
-    if hasattr(user, "verified_followers_count"):
-        metrics_text += f"\n - Verified followers count: {user.verified_followers_count}"
+    if (verified_followers_count := getattr(user, "verified_followers_count", None)) is not None:
+        metrics_text += f"\n - Verified followers count: {verified_followers_count}"
 
-    properties_text = f"- {verification_status_text}"
-    if user.protected:
-        properties_text += "\n- Protected"
-    if user.withheld:
-        properties_text += "\n- Withheld"
-    if hasattr(user, "parody") and user.parody:
-        properties_text += "\n- Marked as parody"
+    properties = [verification_status_text]
+    properties.extend(label for key, label in USER_PROPERTY_FLAGS if getattr(user, key, None))
+    properties_text = "\n".join(f"- {p}" for p in properties)
 
     text = f"""**Profile on X**
 User: {user.name}, @{user.username}
@@ -227,25 +352,25 @@ Account properties:
 
 
 
+@lru_cache(maxsize=4096)
 def extract_username_from_url(url: str) -> Optional[str]:
     # TODO: Users may change their username, invalidating corresponding URLs. Handle this
     # by retrieving the author's ID of the linked tweet.
-    parsed = urlparse(url)
+    path = urlsplit(url).path
     try:
-        candidate = parsed.path.strip("/").split("/")[0]
+        candidate = path.strip("/").partition("/")[0]
         if candidate and len(candidate) >= 3:
             return candidate
     except IndexError:
         return None
 
 
+@lru_cache(maxsize=4096)
 def extract_tweet_id_from_url(url: str) -> tuple[Optional[int], Optional[int]]:
+    if "/status/" not in url:  # Fast path for profile URLs
+        return None, None
     try:
-        parsed = urlparse(url)
-        match = re.fullmatch(
-            r"/[^/]+/status/(\d+)(?:/(?:photo|video)/(\d+))?/?",
-            parsed.path,
-        )
+        match = TWEET_PATH_REGEX.fullmatch(urlsplit(url).path)
         if match:
             tweet_id, media_number = match.groups()
             media_number = int(media_number) if media_number else None
@@ -257,14 +382,9 @@ def extract_tweet_id_from_url(url: str) -> tuple[Optional[int], Optional[int]]:
 
 def _get_best_quality_video_url(variants: list) -> Optional[str]:
     """Returns the URL of the video variant that has the highest bitrate."""
-    bitrate = -1
-    best_url = None
-    for variant in variants:
-        if content_type := variant.get("content_type"):
-            if content_type.startswith("video/") and variant["bit_rate"] > bitrate:
-                bitrate = variant["bit_rate"]
-                best_url = variant["url"]
-    return best_url
+    best = max((variant for variant in variants if (variant.get("content_type") or "").startswith("video/")),
+               key=lambda variant: variant.get("bit_rate", -1), default=None)
+    return best["url"] if best else None
 
 
 if __name__ == "__main__":
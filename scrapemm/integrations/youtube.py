@@ -21,6 +21,7 @@ class YouTube(RetrievalIntegration):
         "youtu.be",
     ]
     cookie_file = CONFIG_DIR / "youtube_cookie.txt"
+    cookie_file_path: Optional[str] = None  # Set upon connection if a cookie is configured
 
     async def _connect(self):
         self.connected = True  # Connect always by default
@@ -30,15 +31,14 @@ class YouTube(RetrievalIntegration):
             # Save the cookie in a .txt file next to the secrets file
             with open(self.cookie_file, "w") as f:
                 f.write(cookie)
+            self.cookie_file_path = self.cookie_file.as_posix()
             logger.info(f"✅ Using cookie to connect to YouTube.")
         else:
             logger.warning(f"⚠️ Missing YouTube cookie. Won't be able to download videos, only thumbnails and metadata.")
 
     async def _get(self, url: str, **kwargs) -> MultimodalSequence:
         """Downloads YouTube video or short using yt-dlp."""
-        cookie = get_secret("youtube_cookie")
-        cookie_file_path = self.cookie_file.as_posix() if cookie else None
         return await get_content_with_ytdlp(url,
                                             platform="YouTube",
-                                            cookiefile=cookie_file_path,
+                                            cookiefile=self.cookie_file_path,
                                             **kwargs)
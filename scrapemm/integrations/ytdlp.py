@@ -2,7 +2,11 @@ import asyncio
 import logging
 import sys
 import tempfile
-from datetime import datetime
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
 from typing import Any, Optional
 
 import aiohttp
@@ -18,7 +22,49 @@ logger = logging.getLogger("scrapeMM")
 # Add yt-dlp-specific logger to print warnings to console
 logger_yt_dlp = logging.getLogger("yt_dlp")
 logger_yt_dlp.setLevel(logging.WARNING)
-logger_yt_dlp.addHandler(logging.StreamHandler(sys.stdout))
+if not any(isinstance(handler, logging.StreamHandler) for handler in logger_yt_dlp.handlers):
+    # Guarded to not print every line twice if this module gets reloaded
+    logger_yt_dlp.addHandler(logging.StreamHandler(sys.stdout))
+
+# yt-dlp downloads are bandwidth- and disk-heavy, so run only a few at a time in dedicated
+# threads instead of competing for the default executor shared with everything else
+MAX_CONCURRENT_YTDLP_DOWNLOADS = 4
+ytdlp_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_YTDLP_DOWNLOADS, thread_name_prefix="yt-dlp")
+
+MAX_YTDLP_INSTANCES_PER_THREAD = 8
+_thread_local = threading.local()
+
+
+def _get_ytdlp(ydl_opts: dict[str, Any]) -> YoutubeDL:
+    """Returns a YoutubeDL instance configured with the given options, re-using the one created
+    earlier in this thread for the same options. Re-use keeps extractor state, such as YouTube's
+    player cache, and the cookie jar. YoutubeDL is not thread-safe, hence one per thread."""
+    instances: dict[str, YoutubeDL] = getattr(_thread_local, "ytdlp_instances", None)
+    if instances is None:
+        instances = _thread_local.ytdlp_instances = {}
+
+    # The output template changes with every call and is therefore updated in place
+    key = repr(sorted((k, v) for k, v in ydl_opts.items() if k != "outtmpl"))
+    ydl = instances.get(key)
+    if ydl is None:
+        if len(instances) >= MAX_YTDLP_INSTANCES_PER_THREAD:
+            instances.pop(next(iter(instances))).close()
+        ydl = instances[key] = YoutubeDL(ydl_opts)
+    else:
+        _set_outtmpl(ydl, ydl_opts["outtmpl"])
+    return ydl
+
+
+def _set_outtmpl(ydl: YoutubeDL, outtmpl: str):
+    """Points the instance's default output template to the given one. Depending on the
+    yt-dlp version, the template is kept as given (a string) or normalized into a dict,
+    and older versions additionally keep a parsed copy in outtmpl_dict."""
+    if isinstance(ydl.params.get("outtmpl"), dict):
+        ydl.params["outtmpl"]["default"] = outtmpl
+    else:
+        ydl.params["outtmpl"] = outtmpl
+    if isinstance(getattr(ydl, "outtmpl_dict", None), dict):
+        ydl.outtmpl_dict["default"] = outtmpl
 
 
 def _run_ytdlp_sync(
@@ -27,9 +73,8 @@ def _run_ytdlp_sync(
         ydl_opts: dict[str, Any],
 ) -> tuple[Optional[Video], Optional[dict[str, Any]]]:
     """Synchronous yt-dlp extraction. Runs blocking I/O and must be called
-    via asyncio.to_thread so it does not stall the event loop."""
-    with YoutubeDL(ydl_opts) as ydl:
-        metadata = ydl.extract_info(url, download=True)
+    via ytdlp_executor so it does not stall the event loop."""
+    metadata = _get_ytdlp(ydl_opts).extract_info(url, download=True)
 
     video = None
     if ext := metadata.get("ext"):
@@ -44,6 +89,15 @@ def _run_ytdlp_sync(
     return video, metadata
 
 
+def _restrict_format_size(format_spec: str, max_size: int) -> str:
+    """Adds a file size filter to each alternative of the yt-dlp format spec. Formats
+    of unknown size stay eligible. Falls back to the unrestricted spec, in which case
+    max_filesize still aborts too-large downloads."""
+    size_filter = f"[filesize<?{max_size}][filesize_approx<?{max_size}]"
+    restricted = "/".join(alternative + size_filter for alternative in format_spec.split("/"))
+    return f"{restricted}/{format_spec}"
+
+
 async def download_video_with_ytdlp(
         url: str,
         session: aiohttp.ClientSession,
@@ -52,15 +106,14 @@ async def download_video_with_ytdlp(
 ) -> tuple[Optional[Video], Optional[Image], Optional[dict[str, Any]]]:
     """Downloads a video and (if not available or exceeds max. duration) its thumbnail, and the metadata using yt-dlp.
     @param max_video_size: Maximum video size in bytes. If the video is larger, the download will be aborted."""
+    temp_path = str(Path(tempfile.gettempdir()) / f"scrapemm-ytdlp-{uuid.uuid4().hex}")
     try:
-        with tempfile.NamedTemporaryFile() as temp_file:
-            temp_path = temp_file.name
-
         ydl_opts: dict[str, Any] = dict(
             outtmpl=f'{temp_path}.%(ext)s',  # Output filename format
             format='best[ext=mp4]/best',  # Download the best video/audio quality
             max_filesize=max_video_size,
             quiet=True,  # Silence logs in console
+            noprogress=True,  # No progress bar output per download
             logger=logger_yt_dlp,  # Reroute logs to dedicated logger
             noplaylist=True,  # Disable playlist downloading
             retries=3,
@@ -71,11 +124,17 @@ async def download_video_with_ytdlp(
         if "youtube" in url or "youtu.be" in url:
             # YouTube delivers video and audio separately when downloaded above 720p.
             # This would require FFmpeg to merge them. Restrict to 720p to avoid that.
-            ydl_opts['format'] = 'best[height<=720]'
+            # Prefer H.264 MP4, which browsers play as is, sparing the transcoding in postprocessing.
+            ydl_opts['format'] = 'best[height<=720][ext=mp4][vcodec^=avc1]/best[height<=720][ext=mp4]/best[height<=720]'
             ydl_opts['extractor_args'] = dict(youtube=dict(player_client=["default"]))
 
+        if max_video_size:
+            # Prefer formats that fit the size limit over downloading (and aborting) a too-large one
+            ydl_opts['format'] = _restrict_format_size(ydl_opts['format'], max_video_size)
+
         # Run blocking yt-dlp work in a thread pool to avoid stalling the event loop.
-        video, metadata = await asyncio.to_thread(_run_ytdlp_sync, url, temp_path, ydl_opts)
+        video, metadata = await asyncio.get_running_loop().run_in_executor(
+            ytdlp_executor, partial(_run_ytdlp_sync, url, temp_path, ydl_opts))
 
         if video and max_video_size and video.size > max_video_size:
             logger.info(f"Removing video {video.reference} because it exceeds the maximum size "
@@ -108,9 +167,14 @@ async def download_video_with_ytdlp(
         else:
             raise RuntimeError(f"Could not download video with yt-dlp: {e}")
 
+    finally:
+        # Remove leftovers of aborted or partial downloads (the video itself got relocated)
+        for leftover in Path(temp_path).parent.glob(Path(temp_path).name + ".*"):
+            leftover.unlink(missing_ok=True)
 
-def fmt_count(v):
-    return f"{v:,}" if isinstance(v, int) else "Unknown"
+
+def fmt_count(v) -> str:
+    return format(v, ",") if type(v) is int else "Unknown"
 
 
 async def compose_data_to_sequence(metadata: dict, video: Video | None, thumbnail: Image | None,
@@ -125,14 +189,10 @@ async def compose_data_to_sequence(metadata: dict, video: Video | None, thumbnai
     comment_count = metadata.get('comment_count', 0)
     description = metadata.get('description', '')
 
-    # Format upload date
+    # Format upload date from YYYYMMDD to YYYY-MM-DD
     formatted_date = upload_date
-    if upload_date and len(upload_date) == 8:
-        try:
-            date_obj = datetime.strptime(upload_date, '%Y%m%d')
-            formatted_date = date_obj.strftime('%Y-%m-%d')
-        except ValueError:
-            logger.debug(f"Could not parse yt-dlp upload_date: {upload_date!r}")
+    if upload_date and len(upload_date) == 8 and upload_date.isdigit():
+        formatted_date = f"{upload_date[:4]}-{upload_date[4:6]}-{upload_date[6:]}"
 
     text = f"""**{platform} Video**
 Author: @{uploader}
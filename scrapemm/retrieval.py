@@ -1,7 +1,9 @@
+import copy
 import logging
 import sqlite3
 import time
-from traceback import format_exc
+from collections import OrderedDict
+from dataclasses import replace
 from typing import Collection, Literal, Coroutine
 
 import aiohttp
@@ -13,7 +15,7 @@ from scrapemm.common import ScrapingResponse
 from scrapemm.common.exceptions import RetrievalFailed, IPBannedError, UnsupportedDomainError, DiskFull, \
     TargetUnavailableError, QuotaExceededError, ContentBlockedError
 from scrapemm.download import download_image, download_video
-from scrapemm.download.common import HEADERS
+from scrapemm.download.common import make_session
 from scrapemm.download.util import looks_like_image_file_url, looks_like_video_file_url, looks_like_hls_url
 from scrapemm.integrations import retrieve_via_integration, fire, decodo, get_integrations_for_url, INTEGRATION_NAMES
 from scrapemm.util import run_with_semaphore, get_domain, normalize_video, preprocess_url
@@ -21,9 +23,18 @@ from scrapemm.util import run_with_semaphore, get_domain, normalize_video, prepr
 logger = logging.getLogger("scrapeMM")
 METHODS = ["integrations", "firecrawl", "decodo"]
 ALL_METHODS = METHODS + INTEGRATION_NAMES
+INTEGRATION_NAMES_LOWER = {name.lower() for name in INTEGRATION_NAMES}
+ALL_METHODS_LOWER = {method.lower() for method in ALL_METHODS}
 
 UNSUPPORTED_DOMAINS = []
 
+MAX_CONCURRENT_RETRIEVALS = 40
+MAX_CONCURRENT_RETRIEVALS_PER_DOMAIN = 16  # Leaves room for other domains in batches dominated by one
+
+# Successful responses of retrieve() calls with a cache_ttl, least recently used evicted first
+RESPONSE_CACHE_SIZE = 1024
+response_cache: OrderedDict[tuple, tuple[float, ScrapingResponse]] = OrderedDict()
+
 BEST_METHODS = {
     # Social media platforms:
     "instagram.com": ["integrations", "decodo"],
@@ -67,7 +78,9 @@ async def retrieve(
         format: Literal["multimodal_sequence", "html"] = "multimodal_sequence",
         include_media: bool = True,
         max_video_size: int | None = None,
-        prioritize: Literal["completeness", "speed"] = "completeness"
+        prioritize: Literal["completeness", "speed"] = "completeness",
+        session: aiohttp.ClientSession | None = None,
+        cache_ttl: float | None = None,
 ) -> ScrapingResponse | list[ScrapingResponse]:
     """Main function of this repository. Downloads the contents present at the given URL(s).
     For each URL, returns a ScrapingResponse containing the retrieved content, error, and method.
@@ -94,6 +107,13 @@ async def retrieve(
     :param prioritize: Prioritization strategy for retrieval. Available options:
         - "completeness": Higher timeout limits and more retries.
         - "speed": Lower timeout limits and fewer retries.
+    :param session: An open aiohttp ClientSession to use, ideally one created with
+        scrapemm.download.common.make_session(). Pass the same session to consecutive calls
+        to keep connections alive between them. The session remains owned by the caller.
+        If None (default), a new session is used for this call only.
+    :param cache_ttl: If set, successful responses are cached across calls and reused for this many
+        seconds by calls with the same parameters. Each call receives its own copy of a cached
+        response. If None (default), every URL is retrieved anew. See also clear_cache().
     """
     # Ensure URLs are string or list
     assert isinstance(urls, (str, list)), "'urls' must be a string or a list of strings."
@@ -124,22 +144,85 @@ async def retrieve(
     else:
         raise AssertionError("'methods' must be either None, 'auto', list[str] or a list[list[str] | 'auto'].")
 
-    urls_unique = set(urls_to_retrieve)
+    urls_unique = list(dict.fromkeys(urls_to_retrieve))  # Deduplicate, keeping the order
+
+    own_session = session is None
+    if own_session:
+        session = make_session()
+    elif session.closed:
+        raise RuntimeError("The provided session is already closed.")
 
-    async with aiohttp.ClientSession(headers=HEADERS) as session:
+    try:
         # Retrieve URLs concurrently
-        tasks = [_retrieve_single(url, session, url_to_methods[url], actions,
-                                  format, include_media, max_video_size, prioritize) for url in
-                 urls_unique]
-        results = await run_with_semaphore(tasks, limit=40, show_progress=show_progress and len(urls_unique) > 1,
-                                           progress_description="Retrieving URLs...")
-
-        # Reconstruct output list
-        results = dict(zip(urls_unique, results))
-        if single_url:
-            return results[urls]
+        if cache_ttl is None:
+            tasks = [_retrieve_single(url, session, url_to_methods[url], actions,
+                                      format, include_media, max_video_size, prioritize) for url in
+                     urls_unique]
         else:
-            return [results[url] for url in urls_to_retrieve]
+            tasks = [_retrieve_single_cached(url, session, url_to_methods[url], actions, format,
+                                             include_media, max_video_size, prioritize, cache_ttl) for url in
+                     urls_unique]
+        results = await run_with_semaphore(tasks, limit=MAX_CONCURRENT_RETRIEVALS,
+                                           show_progress=show_progress and len(urls_unique) > 1,
+                                           progress_description="Retrieving URLs...",
+                                           keys=[get_domain(url) for url in urls_unique],
+                                           limit_per_key=MAX_CONCURRENT_RETRIEVALS_PER_DOMAIN)
+    finally:
+        if own_session:
+            await session.close()
+
+    # Reconstruct output list
+    if single_url:
+        return results[0]
+    index_of = {url: i for i, url in enumerate(urls_unique)}
+    return [results[index_of[url]] for url in urls_to_retrieve]
+
+
+def clear_cache():
+    """Empties the cache of successful responses used by retrieve() calls with a cache_ttl."""
+    response_cache.clear()
+
+
+async def _retrieve_single_cached(
+        url: str,
+        session: aiohttp.ClientSession,
+        methods: list[str] | Literal["auto"],
+        actions: list[dict] | None,
+        format: str,
+        include_media: bool,
+        max_video_size: int | None,
+        prioritize: Literal["completeness", "speed"],
+        cache_ttl: float,
+) -> ScrapingResponse:
+    """Like _retrieve_single, but serves and stores successful responses via the response cache."""
+    key = (url, methods if methods == "auto" else tuple(methods),
+           format, include_media, max_video_size, prioritize)
+    if cached := response_cache.get(key):
+        cached_at, response = cached
+        if time.monotonic() - cached_at < cache_ttl:
+            response_cache.move_to_end(key)
+            return _copy_response(response)
+        del response_cache[key]
+
+    response = await _retrieve_single(url, session, methods, actions, format,
+                                      include_media, max_video_size, prioritize)
+    if response.successful:
+        response_cache[key] = (time.monotonic(), _copy_response(response))
+        response_cache.move_to_end(key)
+        while len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+    return response
+
+
+def _copy_response(response: ScrapingResponse) -> ScrapingResponse:
+    """Returns a copy of the response whose content sequence can be modified without
+    affecting the cached one. Items (images, videos) are shared."""
+    content = response.content
+    if isinstance(content, MultimodalSequence):
+        content = copy.copy(content)
+        content.data = list(content.data)
+    return replace(response, content=content,
+                   errors=dict(response.errors) if response.errors is not None else None)
 
 
 async def _retrieve_single(
@@ -172,7 +255,7 @@ async def _retrieve_single(
     try:
         # Validate methods
         for method in methods:
-            assert method in ALL_METHODS, f"Unknown method '{method}'. Allowed: {ALL_METHODS}"
+            assert method.lower() in ALL_METHODS_LOWER, f"Unknown method '{method}'. Allowed: {ALL_METHODS}"
 
             # Ensure compatibility with methods (local list only — never mutate shared globals)
             if format == "html" and method not in ["decodo", "firecrawl"]:
@@ -192,30 +275,23 @@ async def _retrieve_single(
                 return ScrapingResponse(url=url, content=MultimodalSequence(medium), method="Direct download",
                                         retrieval_time=time.time() - start_time)
 
-        def map_method_to_retrieval_routine(m: str) -> Coroutine:
-            if m.lower() == "firecrawl":
-                return fire.scrape(url, session=session, format=format, actions=actions,
-                                   include_media=include_media)
-            elif m.lower() == "decodo":
-                return decodo.scrape(url, session, format=format,
-                                     timeout=15 if prioritize == "speed" else 60,
-                                     max_retries=1 if prioritize == "speed" else 5,
-                                     include_media=include_media)
-            else:
-                return retrieve_via_integration(url, integration_name=m, session=session,
-                                                max_video_size=max_video_size,
-                                                include_media=include_media)
-
     except Exception as e:
-        logger.error(f"Error while preparing retrieval for '{url}'.\n" + format_exc())
+        logger.exception(f"Error while preparing retrieval for '{url}'.")
         return ScrapingResponse(url=url, content=None, errors=dict(scrapemm=e), retrieval_time=time.time() - start_time)
 
     # Try each method in the specified order until one succeeds
     errors = {}
+    supporting_integrations = {name.lower() for name in get_integrations_for_url(url)}
     logger.debug(f"Trying methods in order: {', '.join(methods)}")
     for method_name in methods:
+        if method_name.lower() in INTEGRATION_NAMES_LOWER and method_name.lower() not in supporting_integrations:
+            # Skip integrations explicitly requested for a domain they cannot handle
+            errors[method_name] = UnsupportedDomainError(f"{method_name} does not support {get_domain(url)}.")
+            continue
+
         logger.debug(f"Now executing {method_name}...")
-        routine = map_method_to_retrieval_routine(method_name)
+        routine = _get_retrieval_routine(method_name, url, session, actions, format, include_media,
+                                         max_video_size, prioritize)
 
         result = await _execute_routine(url, routine, method_name, session)
 
@@ -239,9 +315,35 @@ async def _retrieve_single(
     return ScrapingResponse(url=url, content=None, errors=errors, retrieval_time=time.time() - start_time)
 
 
+def _get_retrieval_routine(
+        method: str,
+        url: str,
+        session: aiohttp.ClientSession,
+        actions: list[dict] | None,
+        format: Literal["multimodal_sequence", "html"],
+        include_media: bool,
+        max_video_size: int | None,
+        prioritize: Literal["completeness", "speed"],
+) -> Coroutine:
+    """Returns the coroutine retrieving the URL with the given method."""
+    match method.lower():
+        case "firecrawl":
+            return fire.scrape(url, session=session, format=format, actions=actions,
+                               include_media=include_media)
+        case "decodo":
+            return decodo.scrape(url, session, format=format,
+                                 timeout=15 if prioritize == "speed" else 60,
+                                 max_retries=1 if prioritize == "speed" else 5,
+                                 include_media=include_media)
+        case _:
+            return retrieve_via_integration(url, integration_name=method, session=session,
+                                            max_video_size=max_video_size,
+                                            include_media=include_media)
+
+
 async def _execute_routine(
         url: str, routine: Coroutine, method_name: str,
-        session: aiohttp.ClientSession, attempts_remaining: int = 1,
+        session: aiohttp.ClientSession,
 ) -> MultimodalSequence | Exception:
     """Executes a retrieval routine and handles exceptions. If an error occurred, returns
     the exception object in place of the result."""
@@ -295,8 +397,10 @@ async def _execute_routine(
         return e
 
     except PlaywrightError as e:
-        if "ERR_NETWORK_CHANGED" in str(e) and attempts_remaining > 0:
-            return await _execute_routine(url, routine, method_name, session, attempts_remaining - 1)
+        # A coroutine can be awaited only once, so there is no retrying the routine here
+        if "ERR_NETWORK_CHANGED" in str(e):
+            logger.warning(f"Network changed while retrieving with method {method_name}: {e}")
+            return e
         else:
             raise
 
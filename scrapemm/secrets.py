@@ -9,7 +9,8 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-from scrapemm.common import get_config_var, update_config, CONFIG_DIR
+from scrapemm.common import get_config_var, update_config, CONFIG_DIR, SafeLoader, SafeDumper, \
+    write_file_atomic
 from scrapemm.util import get_user_input
 
 logger = logging.getLogger("scrapeMM")
@@ -32,6 +33,7 @@ SALT = b'\xa4\x93\xf1\x88\x13\x88'
 SECRETS_PATH = CONFIG_DIR / "secrets"
 
 _password_cache = None
+_secrets_cache: tuple[int, dict] | None = None  # Decrypted secrets along with the secrets file's mtime
 
 
 def _derive_key(password: str) -> bytes:
@@ -47,13 +49,13 @@ def _derive_key(password: str) -> bytes:
 
 
 def _encrypt_dict(data: dict, fernet: Fernet):
-    raw = yaml.safe_dump(data).encode()
+    raw = yaml.dump(data, Dumper=SafeDumper).encode()
     return fernet.encrypt(raw)
 
 
 def _decrypt_dict(token: bytes, fernet: Fernet):
     decrypted = fernet.decrypt(token)
-    return yaml.safe_load(decrypted)
+    return yaml.load(decrypted, Loader=SafeLoader)
 
 
 def _get_password(prompt="🔐 Enter password to unlock secrets: ", pwd: str | None = None) -> Fernet:
@@ -73,9 +75,19 @@ def _load_fernet(pwd: str) -> Fernet:
 
 
 def _load_secrets() -> dict:
+    """Returns a copy of the decrypted secrets. Decrypts the secrets file only if
+    it changed since the last call."""
+    global _secrets_cache
     if not SECRETS_PATH.exists():
         return {}
 
+    mtime = SECRETS_PATH.stat().st_mtime_ns
+    if _secrets_cache is None or _secrets_cache[0] != mtime:
+        _secrets_cache = (mtime, _decrypt_secrets_file() or {})
+    return dict(_secrets_cache[1])
+
+
+def _decrypt_secrets_file() -> dict:
     with open(SECRETS_PATH, "rb") as f:
         encrypted = f.read()
 
@@ -104,8 +116,7 @@ def _save_secrets(data: dict):
     encrypted = _encrypt_dict(data, fernet)
 
     SECRETS_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(SECRETS_PATH, "wb") as f:
-        f.write(encrypted)
+    write_file_atomic(SECRETS_PATH, encrypted)
 
 
 def get_secret(name: str) -> str | None:
@@ -1,13 +1,15 @@
 import asyncio
 import base64
 import binascii
-import json
 import logging
 import re
 import subprocess
 import sys
+import time
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Awaitable, Iterable, Union
+from typing import Optional, Awaitable, Iterable, Union, Hashable
 from urllib.parse import unquote
 
 import aiohttp
@@ -28,7 +30,12 @@ from scrapemm.download.videos import video_from_binary, download_hls_video, is_h
 
 logger = logging.getLogger("scrapeMM")
 
-DOMAIN_REGEX = r"(?:https?:\/\/)?(?:www\.)?([-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6})/?"
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+DOMAIN_REGEX = re.compile(r"(?:https?:\/\/)?(?:www\.)?([-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6})/?")
 
 
 def preprocess_url(url: str) -> str:
@@ -40,8 +47,12 @@ def preprocess_url(url: str) -> str:
 def get_domain(url: str, keep_subdomain: bool = False) -> Optional[str]:
     """Uses regex to get out the domain from the given URL. The output will be
     of the form 'example.com'. No 'www', no 'http'."""
-    url = str(url)
-    match = re.search(DOMAIN_REGEX, url)
+    return _get_domain(str(url), keep_subdomain)
+
+
+@lru_cache(maxsize=16384)
+def _get_domain(url: str, keep_subdomain: bool) -> Optional[str]:
+    match = DOMAIN_REGEX.search(url)
     if match:
         domain = match.group(1)
         if not keep_subdomain:
@@ -50,10 +61,15 @@ def get_domain(url: str, keep_subdomain: bool = False) -> Optional[str]:
         return domain
 
 
+_NO_KEY = object()  # Sentinel for "no key slot was freed yet"
+
+
 async def run_with_semaphore(tasks: Iterable[Awaitable],
                              limit: int,
                              show_progress: bool = True,
-                             progress_description: str | None = None) -> tuple:
+                             progress_description: str | None = None,
+                             keys: Iterable[Hashable] | None = None,
+                             limit_per_key: int | None = None) -> list:
     """
     Runs asynchronous tasks with a concurrency limit.
 
@@ -62,33 +78,79 @@ async def run_with_semaphore(tasks: Iterable[Awaitable],
         limit: The maximum number of coroutines to run concurrently.
         show_progress: Whether to show a progress bar while executing tasks.
         progress_description: The message to display in the progress bar.
+        keys: Optional keys (e.g., domains) of the tasks, in the same order as the tasks.
+        limit_per_key: The maximum number of coroutines sharing a key to run concurrently.
+            Keeps many tasks of a single key from occupying all slots.
 
     Returns:
         list: A list of results returned by the tasks, order-preserved.
     """
-    semaphore = asyncio.Semaphore(limit)  # Limit concurrent executions
-
-    async def limited_coroutine(t: Awaitable):
-        try:
-            async with semaphore:
-                return await t
-        except asyncio.CancelledError:
-            if hasattr(t, "close"):
-                t.close()
-            raise
+    tasks = list(tasks)
+    keys = [None] * len(tasks) if keys is None else list(keys)
+    if len(keys) != len(tasks):
+        raise ValueError("Got a different number of keys than tasks.")
+
+    # A fixed pool of workers consumes the tasks, so only 'limit' of them are
+    # scheduled at any time, regardless of the batch size
+    pending = iter(enumerate(zip(tasks, keys)))
+    running: dict[Hashable, int] = {}  # Number of running tasks per key
+    deferred: dict[Hashable, deque] = {}  # Tasks waiting for a slot of their key
+
+    def next_task(freed_key: Hashable) -> tuple[int, Awaitable, Hashable] | None:
+        # Prefer the tasks waiting for the key whose slot was just freed
+        if deferred.get(freed_key):
+            return deferred[freed_key].popleft()
+        for i, (task, key) in pending:
+            if limit_per_key is not None and running.get(key, 0) >= limit_per_key:
+                # Set aside so that tasks of other keys can proceed
+                deferred.setdefault(key, deque()).append((i, task, key))
+            else:
+                return i, task, key
+        return None
 
-    tasks: list = [asyncio.create_task(limited_coroutine(task)) for task in tasks]
+    results = [None] * len(tasks)
+    progress = tqdm.tqdm(total=len(tasks), desc=progress_description, file=sys.stdout,
+                         mininterval=0.5, smoothing=0.1) if show_progress else None
 
-    # Report completion status of tasks (if more than one task)
-    if show_progress:
-        progress = tqdm.tqdm(total=len(tasks), desc=progress_description, file=sys.stdout)
-        while progress.n < len(tasks):
-            progress.n = sum(task.done() for task in tasks)
-            progress.refresh()
-            await asyncio.sleep(0.1)
-        progress.close()
+    async def worker():
+        key = _NO_KEY
+        while (next_item := next_task(key)) is not None:
+            i, task, key = next_item
+            running[key] = running.get(key, 0) + 1
+            try:
+                results[i] = await task
+            finally:
+                running[key] -= 1
+            if progress:
+                progress.update()
 
-    return await asyncio.gather(*tasks)
+    workers = [asyncio.create_task(worker()) for _ in range(min(limit, len(tasks)))]
+    try:
+        await asyncio.gather(*workers)
+    finally:
+        # Don't leave tasks running in the background if the batch was aborted
+        for worker_task in workers:
+            worker_task.cancel()
+        unstarted = [task for _, (task, _) in pending]
+        unstarted += [task for queue in deferred.values() for _, task, _ in queue]
+        for task in unstarted:
+            if hasattr(task, "close"):
+                task.close()  # Avoids warnings about never-awaited coroutines
+        if progress:
+            progress.close()
+
+    return results
+
+
+def install_uvloop() -> bool:
+    """Makes asyncio use the faster uvloop event loop, if installed (not available on
+    Windows). Call before asyncio.run(). Returns True iff uvloop is used."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 def read_urls_from_file(file_path):
@@ -125,14 +187,15 @@ def get_user_input(prompt: str, multiline: bool = False) -> str:
 
 
 MAX_MEDIA_PER_PAGE = 32
-URL_REGEX = r"https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9@:%_\+.~#?&//=]*)"
-DATA_URI_REGEX = r"data:([\w/+.-]+/[\w.+-]+);base64,([A-Za-z0-9+/=]+)"
-MD_HYPERLINK_REGEX = rf'(!?\[([^]^[]*)\]\((.*?)(?: "[^"]*")?\))'
+URL_REGEX = re.compile(r"https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9@:%_\+.~#?&//=]*)")
+DATA_URI_REGEX = re.compile(r"data:([\w/+.-]+/[\w.+-]+);base64,([A-Za-z0-9+/=]+)")
+MD_HYPERLINK_REGEX = re.compile(r'(!?\[([^]^[]*)\]\((.*?)(?: "[^"]*")?\))', re.DOTALL)
+DOMAIN_ROOT_REGEX = re.compile(r"(:?https?://)?([^/]+)")
 
 
 def preprocess_html(html: str) -> str:
     # Resolve base64-encoded text sequences
-    data_uris = re.findall(DATA_URI_REGEX, html)
+    data_uris = DATA_URI_REGEX.findall(html)
     for mime_type, base64_encoding in data_uris:
         if mime_type.startswith("text/"):
             try:
@@ -299,7 +362,7 @@ async def resolve_media(
     if not media_elements:
         return MultimodalSequence(html)
 
-    media_uris: list[Optional[str]] = [str(element.get("src")) if element.get("src") else None
+    media_uris: list[Optional[str]] = [str(src) if (src := element.get("src")) else None
                                        for element in media_elements]
 
     # 2. Resolve base64 media
@@ -308,6 +371,7 @@ async def resolve_media(
     # 3. Normalize URLs and prepare tasks for remaining elements
     tasks = []
     unique_urls = []  # We use a list to map normalized URLs to their download result to avoid duplicate downloads
+    seen_urls = set()  # Same URLs as above, for constant-time membership checks
 
     # Normalize URLs in URI list
     for i, uri in enumerate(media_uris):
@@ -316,7 +380,7 @@ async def resolve_media(
 
     # Create retrieval tasks for URL elements
     for element, uri in zip(media_elements, media_uris):
-        if uri and is_url(uri) and uri not in unique_urls:
+        if uri and uri not in seen_urls and is_url(uri):
             if element.name in ["video", "source"]:
                 if source_element:
                     tasks.append(fetch_video_via_page(source_element, uri))
@@ -330,6 +394,7 @@ async def resolve_media(
                     tasks.append(
                         download_image(uri, session=session, headers={"Referer": url} if url else {}, **kwargs))
             unique_urls.append(uri)
+            seen_urls.add(uri)
 
     # 4. Download media
     media_results = await run_with_semaphore(tasks, limit=20, show_progress=False)
@@ -470,7 +535,7 @@ async def fetch_video_via_page(
 
 def is_url(href: str) -> bool:
     """Returns True iff the given string is an absolute HTTP URL."""
-    return re.match(URL_REGEX, href) is not None
+    return URL_REGEX.match(href) is not None
 
 
 def is_root_relative_url(href: str) -> bool:
@@ -480,12 +545,12 @@ def is_root_relative_url(href: str) -> bool:
 
 def is_data_uri(href: str) -> bool:
     """Returns True iff the given string is a valid data URI."""
-    return re.match(DATA_URI_REGEX, href) is not None
+    return DATA_URI_REGEX.match(href) is not None
 
 
 def get_domain_root(url: str) -> Optional[str]:
     """Extracts the domain root from the given URL. Allows for missing http(s) prefix."""
-    match = re.match(r"(:?https?://)?([^/]+)", url)
+    match = DOMAIN_ROOT_REGEX.match(url)
     if match:
         return match.group(0)
     else:
@@ -495,14 +560,12 @@ def get_domain_root(url: str) -> Optional[str]:
 def get_markdown_hyperlinks(text: str) -> list[tuple[str, str, str]]:
     """Extracts all web hyperlinks from the given markdown-formatted string. Returns
     a list of fullmatch-hypertext-URL-triples."""
-    pattern = re.compile(MD_HYPERLINK_REGEX, re.DOTALL)
-    hyperlinks = re.findall(pattern, text)
-    return hyperlinks
+    return MD_HYPERLINK_REGEX.findall(text)
 
 
 def decompose_data_uri(href: str) -> Optional[tuple[str, str]]:
     """Extracts the mime type and base64-encoded data from a data URI."""
-    match = re.match(DATA_URI_REGEX, href)
+    match = DATA_URI_REGEX.match(href)
     if match:
         return match.group(1), match.group(2)
     else:
@@ -623,7 +686,7 @@ def probe_video(path: Path) -> dict | None:
         str(path),
     ])
     if result:
-        return json.loads(result.stdout)
+        return json_loads(result.stdout)
 
 
 def is_browser_safe(meta: dict) -> bool:
@@ -698,13 +761,36 @@ def parse_netscape_cookies(cookie_file: Path) -> list[dict]:
     return cookies
 
 
+UNSHORTEN_CACHE_TTL = 3600  # Seconds for which an expanded short URL is re-used
+UNSHORTEN_CACHE_SIZE = 4096
+
+# Maps short URLs to their expansion and the time of expansion
+_unshorten_cache: dict[str, tuple[float, str]] = {}
+
+
 async def unshorten(url: str, session: aiohttp.ClientSession) -> Optional[str]:
     """Expands short URLs to their full form, e.g., URLs from tinyurl.com, bit.ly,
-    goo.gl, youtu.be, t.ly, t.co, etc."""
+    goo.gl, youtu.be, t.ly, t.co, etc. Successful expansions are cached for a while."""
+    url = str(url)
+    if cached := _unshorten_cache.get(url):
+        expanded_at, expanded = cached
+        if time.monotonic() - expanded_at < UNSHORTEN_CACHE_TTL:
+            return expanded
+
+    expanded = await _unshorten(url, session)
+    if expanded:
+        _unshorten_cache.pop(url, None)
+        _unshorten_cache[url] = (time.monotonic(), expanded)
+        if len(_unshorten_cache) > UNSHORTEN_CACHE_SIZE:
+            del _unshorten_cache[next(iter(_unshorten_cache))]  # Drop the oldest entry
+    return expanded
+
+
+async def _unshorten(url: str, session: aiohttp.ClientSession) -> Optional[str]:
     try:
         async with session.get(url, allow_redirects=True) as resp:
             expanded = str(resp.url)
-            if expanded.rstrip("/") != str(url).rstrip("/"):
+            if expanded.rstrip("/") != url.rstrip("/"):
                 return expanded
             # t.co (and similar) return 200 with a meta-refresh instead of a 3xx redirect.
             match = re.search(r"URL=(https?://[^\"'>\s]+)", await resp.text(), re.I)
@@ -1,16 +1,19 @@
 import asyncio
 
-import aiohttp
-
-from scrapemm.download import download_medium
-from scrapemm.download.common import HEADERS
+from scrapemm.download import download_medium, close_curl_cffi_session
+from scrapemm.download.common import make_session
+from scrapemm.util import install_uvloop
 
 
 async def download(url):
-    async with aiohttp.ClientSession(headers=HEADERS) as session:
-        return await download_medium(url, session)
+    try:
+        async with make_session() as session:
+            return await download_medium(url, session)
+    finally:
+        await close_curl_cffi_session()
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(download(
         "https://media.cnn.com/api/v1/images/stellar/prod/ap22087057359494.jpg?c=16x9&q=h_653,w_1160,c_fill/f_webp"))
@@ -1,9 +1,19 @@
-from scrapemm import retrieve
+from scrapemm import retrieve, close_curl_cffi_session
+from scrapemm.util import install_uvloop
 import asyncio
 
+
+async def main(url):
+    try:
+        return await retrieve(url)
+    finally:
+        await close_curl_cffi_session()
+
+
 if __name__ == "__main__":
+    install_uvloop()
     url = "https://www.tiktok.com/@realdonaldtrump/video/7433870905635409198"
-    result = asyncio.run(retrieve(url))
+    result = asyncio.run(main(url))
     if result.errors:
         print(result.errors)
     else:
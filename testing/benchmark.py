@@ -2,7 +2,9 @@ import asyncio
 import time
 from pathlib import Path
 
+from scrapemm.download import close_curl_cffi_session
 from scrapemm.retrieval import retrieve
+from scrapemm.util import install_uvloop
 
 
 async def main():
@@ -13,7 +15,10 @@ async def main():
 
     # Measure total retrieval time
     total_start = time.time()
-    results = await retrieve(urls, prioritize="speed")
+    try:
+        results = await retrieve(urls, prioritize="speed")
+    finally:
+        await close_curl_cffi_session()
     assert isinstance(results, list)
     total_time = time.time() - total_start
     
@@ -48,4 +53,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
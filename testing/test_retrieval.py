@@ -1,12 +1,13 @@
+import asyncio
+
 import pytest
 from ezmm import MultimodalSequence
 from scrapemm.common import ScrapingResponse
 
 from scrapemm import retrieve
+from scrapemm.download.common import make_session
 
-
-@pytest.mark.asyncio
-@pytest.mark.parametrize("url", [
+GENERIC_URLS = [
     "https://factcheckarabic.afp.com/doc.afp.com.9DD6J8",
     "https://www.vishvasnews.com/viral/fact-check-upsc-has-not-reduced-the-maximum-age-limit-for-ias-and-ips-exams/",
     "https://health.medicaldialogues.in/fact-check/brain-health-fact-check/fact-check-is-sprite-the-best-remedy-for-headaches-in-the-world-140368",
@@ -14,7 +15,11 @@ from scrapemm import retrieve
     "https://factuel.afp.com/doc.afp.com.43ZN7NP",
     "https://leadstories.com/365cb414b83e29d26fecae374d55c743a3eac4c7.png",
     "https://leadstories.com/assets_c/2025/08/193f14f06dd6f15b89bf8050e553ad7fb1be6530-thumb-900xauto-3165872.png"
-])
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", GENERIC_URLS)
 async def test_generic_retrieval(url):
     result = await retrieve(url)
     assert isinstance(result, ScrapingResponse)
@@ -25,6 +30,19 @@ async def test_generic_retrieval(url):
     assert content.has_images()
 
 
+@pytest.mark.asyncio
+async def test_concurrent_retrieval_with_shared_session():
+    async with make_session() as session:
+        results = await asyncio.gather(*[retrieve(url, show_progress=False, session=session)
+                                         for url in GENERIC_URLS])
+        assert not session.closed  # A provided session stays open
+    for result in results:
+        assert isinstance(result, ScrapingResponse)
+        assert result
+        assert isinstance(result.content, MultimodalSequence)
+        assert result.content.has_images()
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("url", [
     "https://www.vishvasnews.com/viral/fact-check-upsc-has-not-reduced-the-maximum-age-limit-for-ias-and-ips-exams/",
@@ -58,3 +58,35 @@ async def do_unshorten(short_url):
 async def test_unshorten(short_url: str, long_url: str):
     extended = await do_unshorten(short_url)
     assert extended == long_url
+
+
+class _RedirectingSession:
+    """Minimal stand-in for aiohttp.ClientSession that redirects every GET to a fixed URL."""
+
+    def __init__(self, target_url: str):
+        self.target_url = target_url
+        self.n_requests = 0
+
+    def get(self, url, **kwargs):
+        self.n_requests += 1
+        session = self
+
+        class _Response:
+            url = session.target_url
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return False
+
+        return _Response()
+
+
+@pytest.mark.asyncio
+async def test_unshorten_reuses_cached_expansion():
+    session = _RedirectingSession("https://example.com/long/path")
+    short_url = "https://sho.rt/cached"
+    assert await unshorten(short_url, session) == "https://example.com/long/path"
+    assert await unshorten(short_url, session) == "https://example.com/long/path"
+    assert session.n_requests == 1